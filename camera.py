@@ -0,0 +1,33 @@
+import random
+
+
+# World-layer camera. Screen shake is just an offset that world draws add to
+# their blit positions; the HUD is drawn without it, so shaking costs
+# nothing beyond picking a new offset each frame.
+class Camera:
+    __slots__ = ("rng", "offset", "shake_amount", "shake_frames")
+
+    def __init__(self, rng=random):
+        self.rng = rng
+        self.offset = (0, 0)
+        self.shake_amount = 0
+        self.shake_frames = 0
+
+    def shake(self, amount, frames):
+        # Overlapping shakes keep the strongest amount and the longest duration
+        self.shake_amount = max(self.shake_amount, amount)
+        self.shake_frames = max(self.shake_frames, frames)
+
+    def update(self):
+        if self.shake_frames > 0:
+            self.shake_frames -= 1
+            amount = self.shake_amount
+            self.offset = (self.rng.randint(-amount, amount), self.rng.randint(-amount, amount))
+        else:
+            self.shake_amount = 0
+            self.offset = (0, 0)
+
+    def reset(self):
+        self.shake_amount = 0
+        self.shake_frames = 0
+        self.offset = (0, 0)
@@ -0,0 +1,124 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+
+# Golden frame check: replays a recording headless with the real renderer,
+# hashes the window every few frames and compares the hashes with the ones
+# stored in the golden file. Any drawing change that is meant to leave the
+# picture alone (caches, atlases, dirty rects) has to keep this passing.
+#
+#   python check_frames.py            compare against golden/frames.json
+#   python check_frames.py --update   re-record the golden hashes
+#
+# --update also saves each golden frame as a PNG under golden/frames. On a
+# mismatch the actual frame and a diff image against that PNG (changed
+# pixels in red over the dimmed expected frame) are written to --diff-dir.
+# Hashes depend on the pygame/SDL build that rendered them (font
+# rasterization in particular), so re-record them after upgrading pygame.
+os.environ['SDL_VIDEODRIVER'] = 'dummy'
+os.environ['SDL_AUDIODRIVER'] = 'dummy'
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
+
+import numpy as np
+import pygame
+
+from recording import Recording, replay
+from renderer import Renderer
+from settings import HEIGHT, WIDTH
+
+GOLDEN_DIR = 'golden'
+
+parser = argparse.ArgumentParser(description="Compare rendered frames against golden hashes")
+parser.add_argument('--recording', default=os.path.join(GOLDEN_DIR, 'headless.rec'),
+                    help="recording to replay")
+parser.add_argument('--golden', default=os.path.join(GOLDEN_DIR, 'frames.json'),
+                    help="file holding the golden hashes")
+parser.add_argument('--every', type=int, default=60,
+                    help="hash every Nth frame (only used with --update)")
+parser.add_argument('--update', action='store_true',
+                    help="write the hashes of this run as the new golden file")
+parser.add_argument('--diff-dir', default='frame_diffs',
+                    help="where to write images of frames that do not match")
+
+
+def frame_hash(surface):
+    return hashlib.sha1(pygame.image.tobytes(surface, 'RGB')).hexdigest()
+
+
+def frame_pixels(surface):
+    # (height, width, 3) array of the frame
+    return np.frombuffer(pygame.image.tobytes(surface, 'RGB'), np.uint8).reshape(
+        surface.get_height(), surface.get_width(), 3)
+
+
+def write_diff(path, expected, actual):
+    changed = np.any(expected != actual, axis=2)
+    diff = expected // 3
+    diff[changed] = (255, 0, 0)
+    pygame.image.save(pygame.image.frombytes(diff.tobytes(), (diff.shape[1], diff.shape[0]), 'RGB'),
+                      path)
+    return int(np.count_nonzero(changed))
+
+
+def render_frames(recording, frames):
+    # Yield (frame number, window) for every frame number in `frames`
+    window = pygame.display.set_mode((WIDTH, HEIGHT))
+    renderer = Renderer(window, seed=recording.seed)
+    for frame, session in enumerate(replay(recording), 1):
+        if frame in frames:
+            renderer.draw(session)
+            yield frame, window
+
+
+def reference_path(frame):
+    return os.path.join(GOLDEN_DIR, 'frames', f"frame_{frame:06d}.png")
+
+
+def main():
+    args = parser.parse_args()
+    pygame.init()
+    recording = Recording.load(args.recording)
+
+    if args.update:
+        # Keep a picture of every golden frame next to its hash for diffs
+        os.makedirs(os.path.dirname(reference_path(0)), exist_ok=True)
+        frames = set(range(args.every, len(recording) + 1, args.every))
+        hashes = {}
+        for frame, window in render_frames(recording, frames):
+            hashes[str(frame)] = frame_hash(window)
+            pygame.image.save(window, reference_path(frame))
+        with open(args.golden, 'w') as f:
+            json.dump({"recording": args.recording, "every": args.every, "hashes": hashes}, f, indent=1)
+        print(f"wrote {len(hashes)} frame hashes to {args.golden}")
+        return 0
+
+    with open(args.golden) as f:
+        golden = json.load(f)["hashes"]
+    frames = {int(frame) for frame in golden}
+
+    failures = 0
+    for frame, window in render_frames(recording, frames):
+        if frame_hash(window) == golden[str(frame)]:
+            continue
+        failures += 1
+        os.makedirs(args.diff_dir, exist_ok=True)
+        pygame.image.save(window, os.path.join(args.diff_dir, f"frame_{frame:06d}.png"))
+        message = f"frame {frame}: hash mismatch"
+        if os.path.exists(reference_path(frame)):
+            expected = frame_pixels(pygame.image.load(reference_path(frame)))
+            changed = write_diff(os.path.join(args.diff_dir, f"diff_{frame:06d}.png"),
+                                 expected, frame_pixels(window))
+            message += f", {changed} pixels differ"
+        print(message)
+
+    if failures:
+        print(f"{failures} of {len(frames)} frames differ from {args.golden} (see {args.diff_dir})")
+        return 1
+    print(f"all {len(frames)} frames match {args.golden}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
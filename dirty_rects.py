@@ -0,0 +1,50 @@
+import pygame
+
+
+# Optional dirty-rectangle presentation (F5). The frame is still drawn in
+# full, but instead of flipping the whole window only the areas something
+# was drawn on this frame or last frame (where it now has to be erased) are
+# pushed to the display. Falls back to a full flip when those areas add up to
+# a big part of the screen, or after invalidate() (state changes, anything
+# that moves the whole picture).
+class DirtyRects:
+    def __init__(self, size, full_flip_ratio=0.5):
+        self.enabled = False
+        self.screen_rect = pygame.Rect((0, 0), size)
+        self.full_flip_area = size[0] * size[1] * full_flip_ratio
+        self.full_flips = 0
+        self.partial_updates = 0
+        self._previous = []
+        self._current = []
+        self._full = True
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self.invalidate()
+
+    def invalidate(self):
+        self._full = True
+
+    def add(self, rect):
+        if self.enabled and rect:
+            self._current.append(rect)
+
+    def extend(self, rects):
+        if self.enabled and rects:
+            self._current.extend(rects)
+
+    def present(self):
+        if not self.enabled:
+            pygame.display.flip()
+            return
+        rects = self._previous + self._current
+        self._previous = self._current
+        self._current = []
+        area = sum(rect.width * rect.height for rect in rects)
+        if self._full or area > self.full_flip_area:
+            self._full = False
+            self.full_flips += 1
+            pygame.display.flip()
+        else:
+            self.partial_updates += 1
+            pygame.display.update([rect.clip(self.screen_rect) for rect in rects])
@@ -0,0 +1,119 @@
+import numpy as np
+
+# Components every entity store carries, one contiguous array each
+COMPONENTS = (
+    ("x", np.float32),
+    ("y", np.float32),
+    ("vx", np.float32),
+    ("vy", np.float32),
+    ("health", np.int32),
+    ("hit_timer", np.int32),
+    ("age", np.int32),
+    ("kind", np.int32),
+    ("alive", np.bool_),
+    # Position at the start of the current step, for drawing between steps
+    ("px", np.float32),
+    ("py", np.float32),
+)
+
+
+# Structure-of-arrays storage for one group of entities (enemies, lasers,
+# ...). Live entities are always packed into the first `count` slots, so a
+# component update is a single slice operation, and deleting swaps the last
+# entity into the hole instead of shifting the whole list. The arrays are a
+# pool: spawn() takes the next free slot and remove() hands one back, so
+# entities cost no allocation once the store has grown to the game's peak.
+class ComponentStore:
+    def __init__(self, capacity=64):
+        self.capacity = capacity
+        self.count = 0
+        self.peak = 0   # Most entities alive at once
+        self.grows = 0  # Times the arrays had to be reallocated
+        for name, dtype in COMPONENTS:
+            setattr(self, name, np.zeros(capacity, dtype))
+
+    def __len__(self):
+        return self.count
+
+    def _grow(self):
+        self.capacity *= 2
+        self.grows += 1
+        for name, dtype in COMPONENTS:
+            grown = np.zeros(self.capacity, dtype)
+            grown[:self.count] = getattr(self, name)[:self.count]
+            setattr(self, name, grown)
+
+    def spawn(self, x, y, vx=0, vy=0, health=1, kind=0):
+        if self.count == self.capacity:
+            self._grow()
+        i = self.count
+        self.x[i] = x
+        self.y[i] = y
+        self.vx[i] = vx
+        self.vy[i] = vy
+        self.health[i] = health
+        self.hit_timer[i] = 0
+        self.age[i] = 0
+        self.kind[i] = kind
+        self.alive[i] = True
+        self.px[i] = x
+        self.py[i] = y
+        self.count += 1
+        if self.count > self.peak:
+            self.peak = self.count
+        return i
+
+    def remove(self, i):
+        # Swap-remove: the last entity takes over slot i
+        last = self.count - 1
+        if i != last:
+            for name, _ in COMPONENTS:
+                column = getattr(self, name)
+                column[i] = column[last]
+        self.count = last
+
+    def sweep(self):
+        # Remove everything whose alive flag was cleared. Going from the highest
+        # index down means the entity swapped into a hole is always one that
+        # has already been checked.
+        dead = np.flatnonzero(~self.alive[:self.count])
+        for i in dead[::-1]:
+            self.remove(i)
+        return len(dead)
+
+    def snapshot(self, into=None):
+        # Copy of the live entities, for drawing on another thread. Passing
+        # the copy made last time refills its arrays instead of making new
+        # ones; they are only reallocated when this store has grown past them.
+        if into is None or into.capacity != self.capacity:
+            into = ComponentStore(self.capacity)
+        n = into.count = self.count
+        into.peak = self.peak
+        into.grows = self.grows
+        for name, _ in COMPONENTS:
+            np.copyto(getattr(into, name)[:n], getattr(self, name)[:n])
+        return into
+
+    def save_positions(self):
+        n = self.count
+        self.px[:n] = self.x[:n]
+        self.py[:n] = self.y[:n]
+
+    def positions(self, alpha=1.0):
+        # x and y of the live entities, alpha of the way from where the step
+        # started (0) to where it left them (1)
+        n = self.count
+        if alpha >= 1:
+            return self.x[:n], self.y[:n]
+        return (self.px[:n] + (self.x[:n] - self.px[:n]) * alpha,
+                self.py[:n] + (self.y[:n] - self.py[:n]) * alpha)
+
+    def integrate(self):
+        n = self.count
+        self.x[:n] += self.vx[:n]
+        self.y[:n] += self.vy[:n]
+        self.age[:n] += 1
+        np.maximum(self.hit_timer[:n] - 1, 0, out=self.hit_timer[:n])
+
+    def clear(self):
+        self.count = 0
@@ -1,10 +1,20 @@
 import numpy as np
-from scipy.io import wavfile
 import os
 
-def generate_laser_sound():
-    # Sample rate and duration
-    sample_rate = 44100
+# The synth_* functions return mono 16-bit samples; the game's sound bank
+# turns them straight into mixer sounds and the generate_* functions below
+# save them as the WAV files in assets/sounds
+SAMPLE_RATE = 44100
+
+def write_wav(path, sample_rate, sound):
+    # SciPy is only needed to write files, so importing the synths stays cheap
+    from scipy.io import wavfile
+    if not os.path.exists(os.path.dirname(path)):
+        os.makedirs(os.path.dirname(path))
+    wavfile.write(path, sample_rate, sound)
+
+def synth_laser(sample_rate=SAMPLE_RATE):
+    # Duration
     duration = 0.2
     t = np.linspace(0, duration, int(sample_rate * duration))
     
@@ -22,21 +32,16 @@ def generate_laser_sound():
     sound = (laser + energy) * envelope
     
     # Convert to 16-bit integer
-    sound = np.int16(sound * 32767)
-    
-    # Save
-    if not os.path.exists('assets/sounds'):
-        os.makedirs('assets/sounds')
-    wavfile.write('assets/sounds/shoot.wav', sample_rate, sound)
+    return np.int16(sound * 32767)
 
-def generate_explosion_sound():
-    # Sample rate and duration
-    sample_rate = 44100
+def synth_explosion(sample_rate=SAMPLE_RATE, seed=None):
+    # Duration
     duration = 0.5
     t = np.linspace(0, duration, int(sample_rate * duration))
     
-    # Base explosion (white noise with lowpass filter)
-    noise = np.random.normal(0, 1, len(t))
+    # Base explosion (white noise with lowpass filter); the same seed gives
+    # the same noise
+    noise = np.random.default_rng(seed).normal(0, 1, len(t))
     
     # Add some low frequency rumble
     rumble_freq = 30
@@ -52,14 +57,10 @@ def generate_explosion_sound():
     
     # Normalize and convert to 16-bit integer
     sound = sound / np.max(np.abs(sound))
-    sound = np.int16(sound * 32767)
-    
-    # Save
-    wavfile.write('assets/sounds/explosion.wav', sample_rate, sound)
+    return np.int16(sound * 32767)
 
-def generate_powerup_sound():
-    # Sample rate and duration
-    sample_rate = 44100
+def synth_powerup(sample_rate=SAMPLE_RATE):
+    # Duration
     duration = 0.3
     t = np.linspace(0, duration, int(sample_rate * duration))
     
@@ -81,10 +82,16 @@ def generate_powerup_sound():
     sound = (sound + sparkle) * envelope
     
     # Convert to 16-bit integer
-    sound = np.int16(sound * 32767)
-    
-    # Save
-    wavfile.write('assets/sounds/powerup.wav', sample_rate, sound)
+    return np.int16(sound * 32767)
+
+def generate_laser_sound():
+    write_wav('assets/sounds/shoot.wav', SAMPLE_RATE, synth_laser())
+
+def generate_explosion_sound(seed=None):
+    write_wav('assets/sounds/explosion.wav', SAMPLE_RATE, synth_explosion(seed=seed))
+
+def generate_powerup_sound():
+    write_wav('assets/sounds/powerup.wav', SAMPLE_RATE, synth_powerup())
 
 if __name__ == "__main__":
     print("Generating AI sound effects...")
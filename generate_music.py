@@ -1,37 +1,41 @@
-import pygame
 import numpy as np
-from scipy.io import wavfile
 
-# Create retro arcade music
-def generate_arcade_music():
-    # Sample rate and duration
-    sample_rate = 44100
-    duration = 8.0  # 8 seconds loop
-    t = np.linspace(0, duration, int(sample_rate * duration))
-    
-    # Base melody (simple arcade tune)
-    melody_freq = [440, 523.25, 659.25, 783.99]  # A4, C5, E5, G5
-    melody = np.zeros_like(t)
-    
-    # Create melody pattern
-    for i, freq in enumerate(melody_freq):
-        start = i * duration / len(melody_freq)
-        end = (i + 1) * duration / len(melody_freq)
-        mask = (t >= start) & (t < end)
-        melody[mask] = 0.3 * np.sin(2 * np.pi * freq * t[mask])
-    
+from generate_ai_sounds import SAMPLE_RATE, write_wav
+
+# Retro arcade music: the tune loops forever, so any stretch of it can be
+# synthesized on its own (the game streams it a chunk at a time, see music.py)
+MELODY_FREQ = [440, 523.25, 659.25, 783.99]  # A4, C5, E5, G5
+BASS_FREQ = 220  # A3
+NOTE_LENGTH = 2.0  # seconds per melody note
+
+def synth_music(start, count, sample_rate=SAMPLE_RATE, transpose=0, note_length=NOTE_LENGTH):
+    # Samples start .. start + count of the tune, `transpose` semitones up
+    t = np.arange(start, start + count) / sample_rate
+    pitch = 2 ** (transpose / 12)
+
+    # Base melody (simple arcade tune), one note after the other
+    note = (t // note_length).astype(np.int64) % len(MELODY_FREQ)
+    melody_freq = np.asarray(MELODY_FREQ)[note] * pitch
+    melody = 0.3 * np.sin(2 * np.pi * melody_freq * t)
+
     # Add some bass
-    bass_freq = 220  # A3
-    bass = 0.2 * np.sin(2 * np.pi * bass_freq * t)
-    
+    bass = 0.2 * np.sin(2 * np.pi * BASS_FREQ * pitch * t)
+
     # Combine melody and bass
     music = melody + bass
-    
+
     # Normalize
-    music = np.int16(music * 32767)
-    
+    return np.int16(music * 32767)
+
+# Create retro arcade music
+def synth_arcade_music(sample_rate=SAMPLE_RATE):
+    # Duration
+    duration = NOTE_LENGTH * len(MELODY_FREQ)  # 8 seconds loop
+    return synth_music(0, int(sample_rate * duration), sample_rate)
+
+def generate_arcade_music():
     # Save as WAV file
-    wavfile.write('assets/sounds/background.wav', sample_rate, music)
+    write_wav('assets/sounds/background.wav', SAMPLE_RATE, synth_arcade_music())
 
 if __name__ == "__main__":
     generate_arcade_music()
@@ -1,69 +1,84 @@
+import argparse
 import wave
-import math
-import struct
 import os
 import random
 
+import numpy as np
+
+def write_wav(path, sample_rate, samples):
+    # 16-bit mono, little endian (what struct.pack('h', ...) wrote per sample)
+    with wave.open(path, 'w') as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(samples.astype('<i2').tobytes())
+
+def square(frequency, t):
+    # Square wave for more retro sound: +1 where the sine is positive, else -1
+    return np.where(np.sin(2.0 * np.pi * frequency * t) > 0, 1.0, -1.0)
+
+def uniform_noise(count):
+    # `count` draws of random.random(), taken in one go: the module's Mersenne
+    # Twister state is handed to NumPy (same generator, same 53-bit doubles)
+    # and the advanced state handed back, so seeding `random` gives exactly the
+    # samples (and the later random numbers) the per-sample loop used to
+    version, internal_state, gauss = random.getstate()
+    generator = np.random.RandomState()
+    generator.set_state(('MT19937', np.array(internal_state[:-1], dtype=np.uint32),
+                         internal_state[-1]))
+    noise = generator.random_sample(count)
+    _, keys, position = generator.get_state()[:3]
+    random.setstate((version, tuple(int(key) for key in keys) + (int(position),), gauss))
+    return noise
+
 def generate_shoot_sound():
     # Audio parameters
     sample_rate = 44100
     duration = 0.1  # seconds
-    
+
     # Generate retro shoot sound (descending pitch)
     nframes = int(duration * sample_rate)
-    sound_data = []
-    for x in range(nframes):
-        t = float(x) / sample_rate
-        # Start at higher frequency and descend
-        frequency = 2000 - (t / duration) * 1000
-        # Square wave for more retro sound
-        value = 32767.0 * (1.0 - t/duration) * (1 if math.sin(2.0 * math.pi * frequency * t) > 0 else -1)
-        sound_data.append(struct.pack('h', int(value)))
-    
-    sound_data = b''.join(sound_data)
-    
-    with wave.open('assets/sounds/shoot.wav', 'w') as wav_file:
-        wav_file.setnchannels(1)
-        wav_file.setsampwidth(2)
-        wav_file.setframerate(sample_rate)
-        wav_file.writeframes(sound_data)
+    t = np.arange(nframes) / sample_rate
+    # Start at higher frequency and descend
+    frequency = 2000 - (t / duration) * 1000
+    value = 32767.0 * (1.0 - t/duration) * square(frequency, t)
+
+    # Truncate toward zero like int()
+    write_wav('assets/sounds/shoot.wav', sample_rate, value.astype(np.int16))
 
 def generate_explosion_sound():
     # Audio parameters
     sample_rate = 44100
     duration = 0.4  # seconds
-    
+
     # Generate retro explosion sound
     nframes = int(duration * sample_rate)
-    sound_data = []
-    
-    for x in range(nframes):
-        t = float(x) / sample_rate
-        # Multiple frequencies for richer sound
-        f1 = 100 - (t / duration) * 50  # Low frequency descending
-        f2 = 300 - (t / duration) * 200  # Mid frequency descending
-        
-        # Mix frequencies with noise
-        value = 32767.0 * (1.0 - t/duration) * (
-            0.7 * (1 if math.sin(2.0 * math.pi * f1 * t) > 0 else -1) +
-            0.3 * (1 if math.sin(2.0 * math.pi * f2 * t) > 0 else -1) +
-            0.4 * (2 * random.random() - 1)
-        )
-        
-        sound_data.append(struct.pack('h', int(max(-32767, min(32767, value)))))
-    
-    sound_data = b''.join(sound_data)
-    
-    with wave.open('assets/sounds/explosion.wav', 'w') as wav_file:
-        wav_file.setnchannels(1)
-        wav_file.setsampwidth(2)
-        wav_file.setframerate(sample_rate)
-        wav_file.writeframes(sound_data)
+    t = np.arange(nframes) / sample_rate
+    # Multiple frequencies for richer sound
+    f1 = 100 - (t / duration) * 50  # Low frequency descending
+    f2 = 300 - (t / duration) * 200  # Mid frequency descending
+
+    # Mix frequencies with noise
+    value = 32767.0 * (1.0 - t/duration) * (
+        0.7 * square(f1, t) +
+        0.3 * square(f2, t) +
+        0.4 * (2 * uniform_noise(nframes) - 1)
+    )
+
+    write_wav('assets/sounds/explosion.wav', sample_rate,
+              np.clip(value, -32767, 32767).astype(np.int16))
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate the retro sound effects")
+    parser.add_argument('--seed', type=int, default=None,
+                        help="random seed for the explosion noise (same seed, same files)")
+    args = parser.parse_args()
+    if args.seed is not None:
+        random.seed(args.seed)
+
     # Ensure sounds directory exists
     os.makedirs('assets/sounds', exist_ok=True)
-    
+
     # Generate sound effects
     generate_shoot_sound()
     generate_explosion_sound()
@@ -0,0 +1,103 @@
+import bisect
+import json
+import os
+import queue
+import threading
+import time
+from collections import namedtuple
+
+LEADERBOARD_FILE = 'leaderboard.json'
+LEGACY_HIGH_SCORE_FILE = 'highscore.txt'  # Single score kept by older versions
+LEADERBOARD_SIZE = 10
+
+# One finished game: the score, the level it ended on, how long it lasted in
+# seconds and when it was played
+Entry = namedtuple("Entry", "score level duration date")
+
+
+# The best LEADERBOARD_SIZE games, highest score first. The list in memory is
+# the index: high_score is its first entry and add() inserts in order. Saving
+# hands a copy of the list to a writer thread, so a frame never waits on the
+# disk, and the thread replaces the file with a finished temp file, so a
+# crash mid-write leaves the old leaderboard intact.
+class Leaderboard:
+    def __init__(self, path=LEADERBOARD_FILE, size=LEADERBOARD_SIZE):
+        self.path = path
+        self.size = size
+        self.entries = self.load()
+        self.writes = queue.Queue()
+        self.writer = None
+
+    @property
+    def high_score(self):
+        return self.entries[0].score if self.entries else 0
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                entries = [Entry(**entry) for entry in json.load(f)]
+        except FileNotFoundError:
+            # First run with a leaderboard: keep the old high score
+            try:
+                with open(LEGACY_HIGH_SCORE_FILE) as f:
+                    entries = [Entry(int(f.read()), 1, 0.0, "")]
+            except (OSError, ValueError):
+                entries = []
+        except (OSError, ValueError, TypeError):
+            print(f"Ignoring unreadable leaderboard {self.path}")
+            entries = []
+        entries.sort(key=lambda entry: -entry.score)
+        return entries[:self.size]
+
+    def add(self, score, level, duration):
+        # Returns the game's place (1 is the top), or None if it didn't make
+        # the board. A changed board is saved in the background.
+        entry = Entry(score, level, round(duration, 1), time.strftime("%Y-%m-%d %H:%M"))
+        # Equal scores go after the ones already there
+        index = bisect.bisect_right(self.entries, -score, key=lambda entry: -entry.score)
+        if index >= self.size:
+            return None
+        self.entries.insert(index, entry)
+        del self.entries[self.size:]
+        self.save()
+        return index + 1
+
+    def save(self):
+        if self.writer is None:
+            self.writer = threading.Thread(target=self.write_loop, name="leaderboard writer", daemon=True)
+            self.writer.start()
+        self.writes.put(list(self.entries))
+
+    def close(self):
+        # Wait for the last save to reach the disk
+        if self.writer is not None:
+            self.writes.put(None)
+            self.writer.join()
+            self.writer = None
+
+    def write_loop(self):
+        while True:
+            # Only the newest copy waiting matters
+            entries = self.writes.get()
+            stop = entries is None
+            while not stop and not self.writes.empty():
+                newer = self.writes.get()
+                if newer is None:
+                    stop = True
+                else:
+                    entries = newer
+            if entries is not None:
+                self.write(entries)
+            if stop:
+                return
+
+    def write(self, entries):
+        temp_path = self.path + '.tmp'
+        try:
+            with open(temp_path, 'w') as f:
+                json.dump([entry._asdict() for entry in entries], f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+        except OSError as error:
+            print(f"Could not save the leaderboard: {error}")
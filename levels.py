@@ -0,0 +1,95 @@
+import json
+import os
+from collections import namedtuple
+
+LEVELS_FILE = os.path.join('assets', 'levels.json')
+
+# Level definitions are JSON objects; every key is optional and falls back to
+# the endless progression below, so a level only lists what it changes:
+#
+#   enemies          enemies to destroy before the level is cleared
+#   spawn_interval   frames between enemy spawns
+#   enemy_speed      pixels per frame
+#   enemy_health     hits an enemy takes
+#   waves            spawn schedule instead of the four keys above: a list of
+#                    {"count", "interval", "enemy_speed", "enemy_health"}
+#                    played in order (and repeated if it runs out); every
+#                    wave needs a count, its other keys come from the level
+#   boss_health      boss hit points
+#   boss_shot_delay  frames between boss volleys (defaults to boss_health)
+#   boss_pattern     "single", "double" or "spread"
+BOSS_PATTERNS = ("single", "double", "spread")
+
+# One entry of a level's spawn schedule
+Spawn = namedtuple("Spawn", "interval speed health")
+
+Level = namedtuple("Level", "number enemies schedule boss_health boss_shot_delay boss_pattern")
+
+
+def procedural_level(number):
+    # Endless progression used past the designed levels (and for any key a
+    # designed level leaves out)
+    return {
+        "enemies": max(10, 45 - (number - 1) * 5),    # Fewer but tougher enemies, not below 10
+        "spawn_interval": 60,
+        "enemy_speed": min(10, 2 + (number - 1)),     # Gets faster but caps at 10
+        "enemy_health": 1 + (number - 1) // 2,        # +1 health every 2 levels
+        "boss_health": 100 + (number - 1) * 50,       # +50 health per level
+        "boss_pattern": BOSS_PATTERNS[min(number, len(BOSS_PATTERNS)) - 1],
+    }
+
+
+def compile_level(number, definition):
+    spec = procedural_level(number)
+    spec.update(definition)
+    if spec["boss_pattern"] not in BOSS_PATTERNS:
+        raise ValueError(f"level {number}: unknown boss_pattern {spec['boss_pattern']!r}")
+
+    waves = spec.get("waves") or [{"count": spec["enemies"]}]
+    schedule = []
+    for index, wave in enumerate(waves, 1):
+        if "count" not in wave:
+            raise ValueError(f"level {number}: wave {index} is missing 'count'")
+        spawn = Spawn(wave.get("interval", spec["spawn_interval"]),
+                      wave.get("enemy_speed", spec["enemy_speed"]),
+                      wave.get("enemy_health", spec["enemy_health"]))
+        schedule.extend([spawn] * wave["count"])
+    if not schedule:
+        raise ValueError(f"level {number}: no enemies to spawn")
+
+    return Level(number, len(schedule), tuple(schedule), spec["boss_health"],
+                 spec.get("boss_shot_delay", spec["boss_health"]), spec["boss_pattern"])
+
+
+# Compiled levels indexed by level number. Each level is compiled the first
+# time it is asked for and kept, so the game loop only ever does a list
+# lookup; levels past the designed ones are generated on demand.
+class LevelTable:
+    def __init__(self, definitions=()):
+        self.definitions = list(definitions)
+        self.levels = [None]  # Levels are numbered from 1
+
+    def __getitem__(self, number):
+        while len(self.levels) <= number:
+            next_level = len(self.levels)
+            definition = self.definitions[next_level - 1] if next_level <= len(self.definitions) else {}
+            self.levels.append(compile_level(next_level, definition))
+        return self.levels[number]
+
+
+def load_levels(path=LEVELS_FILE):
+    try:
+        with open(path) as f:
+            return LevelTable(json.load(f)["levels"])
+    except FileNotFoundError:
+        return LevelTable()
+
+
+_default_levels = None
+
+def default_levels():
+    # The table from LEVELS_FILE, loaded once and shared by every session
+    global _default_levels
+    if _default_levels is None:
+        _default_levels = load_levels()
+    return _default_levels
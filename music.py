@@ -0,0 +1,64 @@
+import pygame
+
+from generate_music import NOTE_LENGTH, synth_music
+from sound_bank import to_mixer_format
+
+# Samples per streamed chunk (a quarter second at 44.1 kHz); one chunk plays
+# while the next waits in the channel's queue, so that is all the memory the
+# music ever takes
+CHUNK_SAMPLES = 11025
+MUSIC_VOLUME = 0.4
+
+
+def level_music(level):
+    # How the tune goes on a level: up a whole tone each level (an octave
+    # after six), and quicker, down to half a second a note
+    return {
+        "transpose": (level - 1) % 6 * 2,
+        "note_length": max(0.5, NOTE_LENGTH - (level - 1) * 0.25),
+    }
+
+
+# Keeps the music channel fed: call update() every frame of play and it
+# synthesizes the next chunk of the current level's tune whenever the
+# channel's queue has room, and stop() whenever nothing is being played. A
+# new level cuts off what is queued and restarts the tune with that level's
+# pattern.
+class MusicSequencer:
+    def __init__(self, chunk=CHUNK_SAMPLES):
+        self.chunk = chunk
+        self.channel = None
+        self.level = None
+        self.pattern = None
+        self.position = 0  # Next sample of the tune to synthesize
+
+    def open(self, channel):
+        # Call once the mixer is initialized, with a channel of its own
+        self.channel = channel
+        self.channel.set_volume(MUSIC_VOLUME)
+
+    def next_chunk(self):
+        frequency, size, channels = pygame.mixer.get_init()
+        samples = synth_music(self.position, self.chunk, frequency, **self.pattern)
+        self.position += self.chunk
+        return pygame.mixer.Sound(buffer=to_mixer_format(samples, size, channels))
+
+    def update(self, level):
+        if self.channel is None:
+            return
+        if level != self.level:
+            self.channel.stop()  # Drops the old tune's queued chunk too
+            self.level = level
+            self.pattern = level_music(level)
+            self.position = 0
+
+        if not self.channel.get_busy():
+            self.channel.play(self.next_chunk())
+        if self.channel.get_queue() is None:
+            self.channel.queue(self.next_chunk())
+
+    def stop(self):
+        # Silence until the next update(), which starts the tune over
+        if self.channel is not None:
+            self.channel.stop()
+        self.level = None
@@ -0,0 +1,175 @@
+import copy
+
+import numpy as np
+import pygame
+
+from sprite_cache import SpriteCache
+
+MAX_PARTICLES = 2000
+
+# Fading sparks snap to this many alpha steps so their sprites can be cached
+ALPHA_LEVELS = 32
+SPRITE_CACHE_SIZE = 1024
+
+# Per-particle arrays (color is an index into the system's palette)
+FIELDS = (
+    ("x", np.float32),
+    ("y", np.float32),
+    ("dx", np.float32),
+    ("dy", np.float32),
+    ("gravity", np.float32),
+    ("size", np.float32),
+    ("shrink", np.float32),
+    ("life", np.int32),
+    ("lifetime", np.int32),
+    ("color", np.int32),
+    ("fade", np.bool_),
+    # Position at the start of the current step, for drawing between steps
+    ("px", np.float32),
+    ("py", np.float32),
+)
+
+
+# Every spark in the game lives in one set of NumPy arrays. Bursts are added
+# with emit(), update() moves, shrinks and ages all of them at once and drops
+# the dead ones with a single mask, and draw() hands the whole lot to
+# Surface.blits in one call.
+class ParticleSystem:
+    def __init__(self, max_particles=MAX_PARTICLES, rng=None, seed=None):
+        self.max_particles = max_particles
+        self._rng = rng
+        self.seed = seed
+        self.count = 0
+        self.peak = 0     # Most particles alive at once
+        self.dropped = 0  # Particles cut from bursts by the cap
+        self.palette = []
+        self._palette_index = {}
+        self.sprites = SpriteCache(self._render_sprite, SPRITE_CACHE_SIZE)
+        for name, dtype in FIELDS:
+            setattr(self, name, np.zeros(max_particles, dtype))
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def rng(self):
+        # Made by the first burst: importing numpy.random is a noticeable
+        # part of startup, and the menu never needs it
+        if self._rng is None:
+            self._rng = np.random.default_rng(self.seed)
+        return self._rng
+
+    def _color_index(self, color):
+        color = tuple(color[:3])
+        if color not in self._palette_index:
+            self._palette_index[color] = len(self.palette)
+            self.palette.append(color)
+        return self._palette_index[color]
+
+    def emit(self, x, y, count, speed, size, colors, lifetime,
+             gravity=0.0, shrink=1.0, fade=False, size_scale=1):
+        # speed is a (min, max) range, size an inclusive (min, max) range of
+        # whole numbers, multiplied by size_scale to give the size in pixels.
+        # Bursts that would go over the cap are cut short.
+        wanted = count
+        count = min(count, self.max_particles - self.count)
+        self.dropped += wanted - max(count, 0)
+        if count <= 0:
+            return
+        start, end = self.count, self.count + count
+        rng = self.rng
+        angle = rng.uniform(0, 2 * np.pi, count)
+        velocity = rng.uniform(speed[0], speed[1], count)
+        palette = np.array([self._color_index(color) for color in colors])
+        self.x[start:end] = x
+        self.y[start:end] = y
+        self.dx[start:end] = np.cos(angle) * velocity
+        self.dy[start:end] = np.sin(angle) * velocity
+        self.gravity[start:end] = gravity
+        self.size[start:end] = rng.integers(size[0], size[1] + 1, count) * size_scale
+        self.shrink[start:end] = shrink
+        self.life[start:end] = lifetime
+        self.lifetime[start:end] = lifetime
+        self.color[start:end] = palette[rng.integers(0, len(palette), count)]
+        self.fade[start:end] = fade
+        self.px[start:end] = x
+        self.py[start:end] = y
+        self.count = end
+        self.peak = max(self.peak, end)
+
+    def snapshot(self, into=None):
+        # Copy of the live particles for drawing on another thread; passing
+        # the copy made last time refills its arrays. The copy shares the
+        # palette and the sprite cache. The palette is only ever appended
+        # to, so every index a copy holds stays valid, and the sprite cache
+        # is only used by draw(), so only the drawing thread ever touches it.
+        if into is None:
+            into = copy.copy(self)
+            for name, dtype in FIELDS:
+                setattr(into, name, np.zeros(self.max_particles, dtype))
+        n = into.count = self.count
+        into.peak = self.peak
+        into.dropped = self.dropped
+        for name, _ in FIELDS:
+            np.copyto(getattr(into, name)[:n], getattr(self, name)[:n])
+        return into
+
+    def save_positions(self):
+        n = self.count
+        self.px[:n] = self.x[:n]
+        self.py[:n] = self.y[:n]
+
+    def update(self):
+        n = self.count
+        if not n:
+            return
+        self.x[:n] += self.dx[:n]
+        self.y[:n] += self.dy[:n]
+        self.dy[:n] += self.gravity[:n]
+        self.size[:n] *= self.shrink[:n]
+        self.life[:n] -= 1
+
+        # Compact the survivors to the front in one mask operation
+        alive = self.life[:n] > 0
+        kept = int(np.count_nonzero(alive))
+        if kept < n:
+            for name, _ in FIELDS:
+                column = getattr(self, name)
+                column[:kept] = column[:n][alive]
+            self.count = kept
+
+    def clear(self):
+        self.count = 0
+
+    def _render_sprite(self, radius, color, alpha):
+        sprite = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+        pygame.draw.circle(sprite, (*self.palette[color], alpha), (radius, radius), radius)
+        return sprite
+
+    def draw(self, surface, offset=(0, 0), doreturn=False, alpha=1.0):
+        # Sparks are drawn shifted by offset (the camera), alpha of the way
+        # through the last step; with doreturn the rects of every drawn spark
+        # are returned
+        n = self.count
+        if not n:
+            return []
+        radius = self.size[:n].astype(np.int32)
+        visible = np.flatnonzero(radius > 0)
+        if not len(visible):
+            return []
+        radius = radius[visible]
+        x = self.x[visible]
+        y = self.y[visible]
+        if alpha < 1:
+            x = self.px[visible] + (x - self.px[visible]) * alpha
+            y = self.py[visible] + (y - self.py[visible]) * alpha
+        left = (x.astype(np.int32) - radius + offset[0]).tolist()
+        top = (y.astype(np.int32) - radius + offset[1]).tolist()
+        # Fading sparks: alpha follows the remaining life, in ALPHA_LEVELS steps
+        level = self.life[visible] * ALPHA_LEVELS // self.lifetime[visible]
+        alpha = np.where(self.fade[visible], level * 255 // ALPHA_LEVELS, 255).tolist()
+        color = self.color[visible].tolist()
+
+        get_sprite = self.sprites.get
+        return surface.blits([(get_sprite(r, color[i], alpha[i]), (left[i], top[i]))
+                              for i, r in enumerate(radius.tolist())], doreturn=doreturn)
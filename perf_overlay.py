@@ -0,0 +1,108 @@
+import gc
+import time
+from collections import deque
+
+import pygame
+
+# Phases of one frame, in the order the game loop runs them
+PHASES = ("events", "draw world", "draw HUD", "flip", "update", "collisions")
+
+OVERLAY_COLOR = (50, 255, 50)
+OVERLAY_BACKGROUND = (0, 0, 0, 160)
+
+
+# Rolling per-phase frame timings, toggled in game with F3. Every method
+# returns straight away while the overlay is disabled, so the game loop can
+# leave the calls in place at no real cost.
+class PerfOverlay:
+    def __init__(self, history=120):
+        self.enabled = False
+        self.history = history
+        self.reset()
+
+    def reset(self):
+        self.phase_times = {name: deque(maxlen=self.history) for name in PHASES}
+        self.frame_times = deque(maxlen=self.history)
+        self._current = dict.fromkeys(PHASES, 0.0)
+        self._phase = None
+        self._phase_start = 0.0
+        self._frame_start = None
+        self._background = None
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self.reset()
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self._frame_start is not None:
+            self.frame_times.append(now - self._frame_start)
+        self._frame_start = now
+
+    def phase(self, name):
+        # Close the running phase and start timing the next one (None just closes)
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self._phase is not None:
+            self._current[self._phase] += now - self._phase_start
+        self._phase = name
+        self._phase_start = now
+
+    def end_frame(self):
+        if not self.enabled:
+            return
+        self.phase(None)
+        for name, seconds in self._current.items():
+            self.phase_times[name].append(seconds)
+            self._current[name] = 0.0
+
+    def frame_percentiles(self):
+        # p50 and p99 of the frame-to-frame time in milliseconds
+        if not self.frame_times:
+            return 0.0, 0.0
+        ordered = sorted(self.frame_times)
+        p50 = ordered[len(ordered) // 2]
+        p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+        return p50 * 1000, p99 * 1000
+
+    def summary(self, counts=None, pools=None, stats=None):
+        lines = []
+        for name in PHASES:
+            samples = self.phase_times[name]
+            average = sum(samples) / len(samples) * 1000 if samples else 0.0
+            lines.append(f"{name}: {average:.2f} ms")
+        p50, p99 = self.frame_percentiles()
+        lines.append(f"frame p50: {p50:.1f} ms  p99: {p99:.1f} ms")
+        if counts:
+            lines.append("  ".join(f"{name} {count}" for name, count in counts.items()))
+        if pools:
+            # Peak use of each pool against its size; + marks a pool that had to grow
+            lines.append("pools: " + "  ".join(f"{name} {peak}/{capacity}" + "+" * grows
+                                               for name, (peak, capacity, grows) in pools.items()))
+            collections = "/".join(str(stats["collections"]) for stats in gc.get_stats())
+            lines.append(f"gc collections (gen 0/1/2): {collections}")
+        if stats:
+            # Running totals: one line per source of {counter: total}
+            for source, totals in stats.items():
+                lines.append(f"{source}: " + "  ".join(f"{name} {total}" for name, total in totals.items()))
+        return lines
+
+    def draw(self, surface, font, counts, pools=None, stats=None):
+        if not self.enabled:
+            return
+        lines = self.summary(counts, pools, stats)
+        line_height = font.get_linesize()
+        width = max(font.size(line)[0] for line in lines) + 10
+        height = line_height * len(lines) + 10
+        if self._background is None or self._background.get_size() != (width, height):
+            self._background = pygame.Surface((width, height), pygame.SRCALPHA)
+            self._background.fill(OVERLAY_BACKGROUND)
+        top = surface.get_height() - height
+        panel = surface.blit(self._background, (0, top))
+        for i, line in enumerate(lines):
+            text = font.render(line, True, OVERLAY_COLOR)
+            surface.blit(text, (5, top + 5 + i * line_height))
+        return panel
@@ -0,0 +1,146 @@
+import copy
+import threading
+import time
+from collections import deque
+
+from session import GameSession
+from settings import MAX_CATCH_UP_STEPS, STEP, GameState
+from spatial_hash import SpatialHash
+
+# What the renderer reads from a session besides the objects copied below
+SNAPSHOT_FIELDS = (
+    "state", "score", "high_score", "current_level", "lives", "levels", "frame",
+    "scroll", "prev_scroll", "prev_boss", "boss_shoot_timer",
+    "score_multiplier", "rapid_fire", "shield_active",
+)
+
+
+# Entity stores and the particle system, refilled in place by fill()
+STORES = ("enemies", "lasers", "boss_lasers", "power_ups", "explosions", "particles")
+
+
+def copy_slots(source, target):
+    for name in type(source).__slots__:
+        setattr(target, name, getattr(source, name))
+
+
+# Everything Renderer.draw() looks at, copied out of a session after a step.
+# A snapshot is made once and refilled by fill(): its arrays are reused, so
+# publishing a step allocates nothing once the stores have reached their
+# peak. `time` is when the step was due, for interpolating between it and
+# the step before.
+class Snapshot:
+    def __init__(self, session, time, grid=False):
+        for name in STORES:
+            setattr(self, name, None)
+        self.player_ship = copy.copy(session.player_ship)
+        self.camera = copy.copy(session.camera)
+        self.collision_grid = SpatialHash(session.collision_grid.cell_size)
+        self.fill(session, time, grid)
+
+    def fill(self, session, time, grid=False):
+        for name in SNAPSHOT_FIELDS:
+            setattr(self, name, getattr(session, name))
+        self.time = time
+        self.boss = tuple(session.boss) if session.boss else None
+        copy_slots(session.player_ship, self.player_ship)
+        copy_slots(session.camera, self.camera)
+        for name in STORES:
+            setattr(self, name, getattr(session, name).snapshot(getattr(self, name)))
+        # The grid is only copied while its debug view is on
+        if grid:
+            session.collision_grid.snapshot(self.collision_grid)
+        else:
+            self.collision_grid.clear()
+
+    # For the F3 overlay, which must not look at the live session: the
+    # copied stores carry the same counts the session's do
+    entity_counts = GameSession.entity_counts
+    pool_stats = GameSession.pool_stats
+
+
+# Optional threaded game loop (python game.py --threaded): the session steps
+# on this thread at FPS steps per second while the main thread draws the
+# latest snapshot, so the wait for the display overlaps with simulation work.
+#
+# The snapshots are double buffered: `latest` is the newest one and the
+# other is refilled after each step, then becomes `latest` in a single
+# assignment. The main thread draws between acquire() and release(); a step
+# that finishes while the snapshot it would refill is being drawn just isn't
+# published, so neither thread waits for the other. `events` carries each
+# step's sounds and finished games to the main thread, which owns the mixer
+# and the leaderboard. `inputs(step)` gives the input bits for every step
+# (None stops the thread); live_inputs() combines the buttons the main thread
+# last saw held with the key presses it queued since the step before.
+class SimulationThread(threading.Thread):
+    def __init__(self, session, inputs):
+        super().__init__(name="simulation", daemon=True)
+        self.session = session
+        self.inputs = inputs
+        self.show_grid = False  # Set by the main thread (F4)
+        self.held = 0           # Set by the main thread
+        self.presses = deque()  # Filled by the main thread
+        self.events = deque()   # (sounds, finished game or None) per step
+        now = time.perf_counter()
+        self.latest = Snapshot(session, now)
+        self.back = Snapshot(session, now)
+        self.drawing = None     # The snapshot the main thread is drawing
+        self.swap = threading.Lock()
+        self.steps = 0
+        self.running = True
+
+    def stop(self):
+        self.running = False
+        self.join()
+
+    def acquire(self):
+        # The newest snapshot, kept as it is until release()
+        with self.swap:
+            self.drawing = self.latest
+        return self.drawing
+
+    def release(self):
+        self.drawing = None
+
+    def live_inputs(self):
+        inputs = self.held
+        while self.presses:
+            inputs |= self.presses.popleft()
+        return inputs
+
+    def alpha(self, snapshot, now):
+        # Draw one step behind: from the step before the snapshot at its due
+        # time to the snapshot itself a step later
+        return min(1.0, max(0.0, (now - snapshot.time) / STEP))
+
+    def run(self):
+        session = self.session
+        due = time.perf_counter()
+        while self.running:
+            now = time.perf_counter()
+            if now < due:
+                time.sleep(due - now)
+                continue
+            # Drop the time a long hitch would take to catch up on
+            due = max(due, now - MAX_CATCH_UP_STEPS * STEP)
+
+            inputs = self.inputs(self.steps)
+            if inputs is None:
+                break
+            state = session.state
+            session.step(inputs)
+            self.steps += 1
+
+            finished = None
+            if session.state == GameState.GAME_OVER and state != GameState.GAME_OVER:
+                finished = (session.score, session.current_level,
+                            (session.frame - session.game_started) * STEP)
+            self.events.append((session.sounds, finished))
+            with self.swap:
+                back = None if self.back is self.drawing else self.back
+            if back is not None:
+                back.fill(session, due, self.show_grid)
+                with self.swap:
+                    self.back, self.latest = self.latest, back
+            due += STEP
+        self.running = False
@@ -0,0 +1,69 @@
+import struct
+
+from session import GameSession
+
+# File layout: header (magic, format version, seed, frame count), then the
+# per-frame input bitmasks run-length encoded as (repeat count, inputs)
+# pairs. Held keys give long runs, so a minute of play is usually a few
+# hundred bytes.
+MAGIC = b"ASRC"
+VERSION = 1
+HEADER = struct.Struct("<4sBQI")
+RUN = struct.Struct("<HB")
+MAX_RUN = 0xFFFF
+
+
+# Seed plus the input bits of every frame of a session: all it takes to
+# replay the session exactly, at any speed.
+class Recording:
+    def __init__(self, seed, inputs=b""):
+        self.seed = seed
+        self.inputs = bytearray(inputs)
+
+    def __len__(self):
+        return len(self.inputs)
+
+    def record(self, inputs):
+        self.inputs.append(inputs)
+
+    def to_bytes(self):
+        data = bytearray(HEADER.pack(MAGIC, VERSION, self.seed, len(self.inputs)))
+        i = 0
+        while i < len(self.inputs):
+            value = self.inputs[i]
+            run = 1
+            while (i + run < len(self.inputs) and self.inputs[i + run] == value
+                   and run < MAX_RUN):
+                run += 1
+            data += RUN.pack(run, value)
+            i += run
+        return bytes(data)
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, version, seed, frames = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("not a recording (or an unsupported version)")
+        inputs = bytearray()
+        for run, value in RUN.iter_unpack(data[HEADER.size:]):
+            inputs += bytes((value,)) * run
+        if len(inputs) != frames:
+            raise ValueError(f"recording is truncated: {len(inputs)} of {frames} frames")
+        return cls(seed, inputs)
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read())
+
+
+def replay(recording, **session_args):
+    # Step a fresh session through the recording, yielding it after every frame
+    session = GameSession(seed=recording.seed, **session_args)
+    for inputs in recording.inputs:
+        session.step(inputs)
+        yield session
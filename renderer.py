@@ -0,0 +1,434 @@
+import math
+import os
+import random
+
+import pygame
+
+from dirty_rects import DirtyRects
+from perf_overlay import PerfOverlay
+from settings import (
+    DOUBLE_LASER_WIDTH, EXPLOSION_FRAMES, HEIGHT, NEON_BLUE, NEON_GREEN, NEON_PINK, NEON_RED,
+    NEON_YELLOW, PLAYER_HEIGHT, PLAYER_WIDTH, POWER_UP_COLORS, POWER_UP_SIZE, RED, WHITE, WIDTH,
+    YELLOW, GameState,
+)
+from sprite_cache import SpriteAtlas
+from starfield import Starfield
+from text_cache import GlyphAtlas, TextCache
+
+# Create retro-style fonts
+def create_retro_font(size):
+    try:
+        return pygame.font.Font(os.path.join('assets', 'fonts', 'arcade.ttf'), size)
+    except:
+        # Fallback to built-in font with pixel-style
+        return pygame.font.Font(None, size)
+
+def render_enemy(surface, x, y, enemy_type, flash=False):
+    color = WHITE if flash else NEON_RED
+    if enemy_type == "normal":
+        # Space Invaders / Galaxian style enemy
+        size = 30
+        # Body outline
+        points = [
+            (x + size//2, y),          # Top
+            (x, y + size//2),          # Left
+            (x, y + size),             # Bottom Left
+            (x + size, y + size),      # Bottom Right
+            (x + size, y + size//2),   # Right
+            (x + size//2, y)           # Back to Top
+        ]
+        pygame.draw.lines(surface, color, True, points, 2)
+
+        # "Antenna" details
+        pygame.draw.line(surface, color, (x + size//4, y + size//2),
+                        (x + size//4, y + size//4), 2)
+        pygame.draw.line(surface, color, (x + 3*size//4, y + size//2),
+                        (x + 3*size//4, y + size//4), 2)
+    else:  # Boss
+        color = WHITE if flash else NEON_PINK
+        width = 96
+        height = 96
+
+        # Main hull (geometric shapes)
+        points = [
+            (x + width//4, y),             # Top Left
+            (x + 3*width//4, y),           # Top Right
+            (x + width, y + height//2),    # Middle Right
+            (x + 3*width//4, y + height),  # Bottom Right
+            (x + width//4, y + height),    # Bottom Left
+            (x, y + height//2),            # Middle Left
+        ]
+        pygame.draw.lines(surface, color, True, points, 2)
+
+        # Interior details
+        pygame.draw.line(surface, color, (x + width//4, y),
+                        (x + width//4, y + height), 2)
+        pygame.draw.line(surface, color, (x + 3*width//4, y),
+                        (x + 3*width//4, y + height), 2)
+
+def render_laser(surface, x, y, width):
+    # Vector style laser (line with glow)
+    pygame.draw.line(surface, NEON_GREEN, (x + width//2, y),
+                    (x + width//2, y + 20), 4)
+    # Glow effect
+    pygame.draw.line(surface, WHITE, (x + width//2, y),
+                    (x + width//2, y + 20), 2)
+
+def render_explosion(surface, x, y, frame):
+    # Vector style explosion (expanding lines)
+    size = frame * 3
+    color = NEON_YELLOW if frame % 2 == 0 else NEON_RED
+    points = []
+    for i in range(8):
+        angle = i * math.pi / 4
+        end_x = x + size * math.cos(angle)
+        end_y = y + size * math.sin(angle)
+        points.append((x, y))
+        points.append((end_x, end_y))
+
+    # Draw explosion lines
+    for i in range(0, len(points), 2):
+        pygame.draw.line(surface, color, points[i], points[i+1], 2)
+
+# Vector sprite atlas: every variant of the vector shapes the game can ask
+# for, rendered once so drawing enemies, lasers and explosions is a single
+# blit (the player is drawn from its own images, see create_player_image)
+def build_vector_atlas():
+    atlas = SpriteAtlas()
+
+    # Enemies and boss, normal and flashing white (2 px lines need a margin)
+    for flash in (False, True):
+        atlas.add(("normal", flash), (34, 34), (2, 2), render_enemy, "normal", flash)
+        atlas.add(("boss", flash), (100, 100), (2, 2), render_enemy, "boss", flash)
+
+    atlas.add(("laser", DOUBLE_LASER_WIDTH), (DOUBLE_LASER_WIDTH, 24), (0, 2),
+              render_laser, DOUBLE_LASER_WIDTH)
+
+    # Explosion rays grow 3 px a frame
+    for frame in range(EXPLOSION_FRAMES):
+        reach = frame * 3 + 2
+        atlas.add(("explosion", frame), (reach * 2, reach * 2), (reach, reach),
+                  render_explosion, frame)
+
+    return atlas
+
+# Create heart image for lives
+def create_heart():
+    surface = pygame.Surface((20, 20), pygame.SRCALPHA)
+    pygame.draw.circle(surface, NEON_RED, (5, 10), 5)
+    pygame.draw.circle(surface, NEON_RED, (15, 10), 5)
+    pygame.draw.polygon(surface, NEON_RED, [(10, 18), (0, 8), (20, 8)])
+    return surface
+
+# Player ship image, in its own colour or flashing white
+def create_player_image(color):
+    surface = pygame.Surface((PLAYER_WIDTH, PLAYER_HEIGHT), pygame.SRCALPHA)
+    pygame.draw.polygon(surface, color, [
+        (PLAYER_WIDTH//2, 0),  # Top point
+        (0, PLAYER_HEIGHT),    # Bottom left
+        (PLAYER_WIDTH//2, PLAYER_HEIGHT*3//4),  # Bottom middle
+        (PLAYER_WIDTH, PLAYER_HEIGHT)  # Bottom right
+    ])
+    return surface
+
+# Power-up glow animation: pulse runs over POWER_UP_PULSE_FRAMES frames, so every
+# frame of every power-up colour is baked once at startup
+POWER_UP_PULSE_FRAMES = 60
+POWER_UP_GLOW_MARGIN = 9  # The outer glow reaches 9 px past the box at full pulse
+
+def render_power_up_frame(color, pulse):
+    size = POWER_UP_SIZE + 2 * POWER_UP_GLOW_MARGIN
+    frame = pygame.Surface((size, size), pygame.SRCALPHA)
+
+    # Pulsing glow: three nested rectangles with decreasing opacity. They all
+    # share the box colour, so each ring is filled with the alpha the stacked
+    # translucent rectangles add up to
+    glow_size = abs(math.sin(pulse * 0.1)) * 10  # Pulsing size
+    transparency = 1.0
+    for i in reversed(range(3)):
+        glow_alpha = 128 // (i + 1)  # Decreasing alpha
+        transparency *= 1 - glow_alpha / 255
+        offset = int(POWER_UP_GLOW_MARGIN - i * 2 - glow_size/2)
+        extent = int(POWER_UP_SIZE + i * 4 + glow_size)
+        frame.fill((*color, round((1 - transparency) * 255)), (offset, offset, extent, extent))
+
+    # The main power-up box
+    frame.fill(color, (POWER_UP_GLOW_MARGIN, POWER_UP_GLOW_MARGIN, POWER_UP_SIZE, POWER_UP_SIZE))
+    return frame.convert_alpha()
+
+
+# Draws a GameSession onto a surface. Holds everything that needs a display:
+# fonts, pre-rendered sprites, the star layers and the dirty-rectangle
+# bookkeeping, so any number of sessions can run without one.
+#
+# Only what the menu needs is built up front. The sprites for the game
+# itself are built by load_steps(), one small step at a time, which the game
+# loop runs while the menu is up; draw() finishes whatever is left before
+# the first frame that needs them.
+class Renderer:
+    def __init__(self, surface, stars=150, perf=None, seed=None):
+        self.surface = surface
+        self.perf = perf if perf is not None else PerfOverlay()
+
+        # Initialize fonts with different sizes
+        self.large_font = create_retro_font(64)  # For title
+        self.medium_font = create_retro_font(32)  # For menu items
+        self.small_font = create_retro_font(24)   # For score and lives
+        self.debug_font = create_retro_font(20)   # For the frame-time overlay
+
+        # Labels are rendered once per (font, text, color) and reused while unchanged
+        self.text_cache = TextCache()
+
+        # Background stars (more stars and different sizes), pre-rendered per speed layer
+        self.starfield = Starfield(WIDTH, HEIGHT, stars, rng=random.Random(seed))
+
+        # Dirty-rectangle presentation (F5) and the collision grid view (F4)
+        self.dirty_rects = DirtyRects((WIDTH, HEIGHT))
+        self.presented_state = None
+        self.show_collision_grid = False
+
+        self.loader = self.load_steps()
+        self.loaded = False
+
+    def load_steps(self):
+        # Game sprites, yielding after each piece
+        # Score digits are composed from pre-rendered glyphs instead of
+        # rasterizing the whole number every frame
+        self.score_glyphs = GlyphAtlas(self.small_font, NEON_GREEN, "0123456789")
+        self.heart_img = create_heart()
+        self.player_img = create_player_image(NEON_BLUE)
+        self.player_flash_img = create_player_image(WHITE)
+        yield
+        self.vector_atlas = build_vector_atlas()
+        yield
+        self.power_up_frames = []
+        for color in POWER_UP_COLORS:
+            self.power_up_frames.append([render_power_up_frame(color, pulse)
+                                         for pulse in range(POWER_UP_PULSE_FRAMES)])
+            yield
+        self.loaded = True
+
+    def finish_loading(self):
+        for _ in self.loader:
+            pass
+
+    def draw_score(self, score, x, y):
+        # Classic arcade style scoring (right aligned, leading zeros)
+        score_text = f"{score:08d}"  # 8 digits with leading zeros
+        return self.score_glyphs.draw(self.surface, score_text, (x, y))
+
+    def draw_power_up(self, x, y, power_type, pulse):
+        return self.surface.blit(self.power_up_frames[power_type][pulse % POWER_UP_PULSE_FRAMES],
+                                 (x - POWER_UP_GLOW_MARGIN, y - POWER_UP_GLOW_MARGIN))
+
+    def draw_player(self, player_ship, offset=(0, 0), alpha=1.0):
+        surface = self.surface
+        x, y = player_ship.position(alpha)
+        # Draw player with flash effect
+        rects = []
+        if player_ship.flash_effect > 0:
+            rects.append(surface.blit(self.player_flash_img,
+                        (x - PLAYER_WIDTH//2 + offset[0],
+                         y - PLAYER_HEIGHT//2 + offset[1])))
+        else:
+            # Normal player drawing with invulnerability blinking
+            if player_ship.invulnerable == 0 or player_ship.invulnerable % 6 < 3:
+                rects.append(surface.blit(self.player_img,
+                           (x - PLAYER_WIDTH//2 + offset[0],
+                            y - PLAYER_HEIGHT//2 + offset[1])))
+
+        # Draw health bar
+        health_width = (PLAYER_WIDTH * player_ship.health) // 100
+        rects.append(pygame.draw.rect(surface, RED,
+                        (x - PLAYER_WIDTH//2 + offset[0],
+                         y + PLAYER_HEIGHT//2 + 5 + offset[1],
+                         PLAYER_WIDTH, 5)))
+        pygame.draw.rect(surface, NEON_GREEN,
+                        (x - PLAYER_WIDTH//2 + offset[0],
+                         y + PLAYER_HEIGHT//2 + 5 + offset[1],
+                         health_width, 5))
+        return rects
+
+    def draw(self, session, alpha=1.0):
+        # alpha: how far the display is between the session's last two
+        # steps (1 draws the latest one as it is)
+        window = self.surface
+        dirty_rects = self.dirty_rects
+        text_cache = self.text_cache
+
+        if session.state != GameState.MENU and not self.loaded:
+            self.finish_loading()
+
+        # Anything drawn the first frame after a state change needs a full flip
+        if session.state != self.presented_state:
+            dirty_rects.invalidate()
+            self.presented_state = session.state
+
+        # Clear screen
+        window.fill((0, 0, 20))
+
+        # Draw stars
+        self.starfield.scroll_to(session.prev_scroll + (session.scroll - session.prev_scroll) * alpha)
+        self.starfield.draw(window)
+
+        if session.state == GameState.MENU:
+            self.perf.phase("draw HUD")
+
+            # Draw title with retro font
+            title = text_cache.render(self.large_font, "SPACE SHOOTER", WHITE)
+            title_rect = title.get_rect(center=(WIDTH//2, HEIGHT//3))
+            dirty_rects.add(window.blit(title, title_rect))
+
+            # Draw "Press SPACE to Start" with medium font
+            start_text = text_cache.render(self.medium_font, "PRESS SPACE TO START",
+                                           (255, 255, 255) if session.frame // 30 % 2 else (100, 100, 100))
+            start_rect = start_text.get_rect(center=(WIDTH//2, HEIGHT*2//3))
+            dirty_rects.add(window.blit(start_text, start_rect))
+
+        elif session.state == GameState.PLAYING:
+            self.draw_world(session, alpha)
+            self.perf.phase("draw HUD")
+            self.draw_hud(session)
+
+        elif session.state == GameState.LEVEL_COMPLETE:
+            self.perf.phase("draw HUD")
+
+            # Draw level complete message with large font
+            level_text = text_cache.render(self.large_font, f"LEVEL {session.current_level} COMPLETE!", (0, 255, 0))
+            level_rect = level_text.get_rect(center=(WIDTH//2, HEIGHT//2))
+            dirty_rects.add(window.blit(level_text, level_rect))
+
+        elif session.state == GameState.GAME_OVER:
+            self.perf.phase("draw HUD")
+
+            # Draw "GAME OVER"
+            game_over_text = text_cache.render(self.large_font, "GAME OVER", RED)
+            game_over_rect = game_over_text.get_rect(center=(WIDTH//2, HEIGHT//3))
+            dirty_rects.add(window.blit(game_over_text, game_over_rect))
+
+            # Draw final score
+            score_text = text_cache.render(self.medium_font, f"Final Score: {session.score}", WHITE)
+            score_rect = score_text.get_rect(center=(WIDTH//2, HEIGHT//2))
+            dirty_rects.add(window.blit(score_text, score_rect))
+
+            # Draw high score (it already includes this game's score)
+            high_score = max(session.high_score, session.score)
+            high_score_text = text_cache.render(self.medium_font, f"High Score: {high_score}", YELLOW)
+            high_score_rect = high_score_text.get_rect(center=(WIDTH//2, HEIGHT//2 + 50))
+            dirty_rects.add(window.blit(high_score_text, high_score_rect))
+
+            # Draw restart prompt
+            restart_text = text_cache.render(self.small_font, "Press ENTER to play again", WHITE)
+            restart_rect = restart_text.get_rect(center=(WIDTH//2, HEIGHT*3//4))
+            dirty_rects.add(window.blit(restart_text, restart_rect))
+
+    def draw_world(self, session, alpha=1.0):
+        window = self.surface
+        dirty_rects = self.dirty_rects
+        atlas = self.vector_atlas
+
+        if dirty_rects.enabled:
+            dirty_rects.extend(self.starfield.dirty_rects())
+
+        # World objects are drawn shifted by the camera (screen shake);
+        # the stars behind them and the HUD on top stay put
+        ox, oy = session.camera.offset
+
+        # Draw the player
+        dirty_rects.extend(self.draw_player(session.player_ship, session.camera.offset, alpha))
+
+        # Draw enemies
+        enemies = session.enemies
+        n = enemies.count
+        xs, ys = enemies.positions(alpha)
+        for x, y, hit_timer in zip(xs.tolist(), ys.tolist(), enemies.hit_timer[:n].tolist()):
+            dirty_rects.add(atlas.blit(window, ("normal", hit_timer > 0), x + ox, y + oy))
+
+        # Draw boss
+        boss = session.boss
+        if boss:
+            x, y = boss[0], boss[1]
+            if session.prev_boss:
+                x = session.prev_boss[0] + (x - session.prev_boss[0]) * alpha
+                y = session.prev_boss[1] + (y - session.prev_boss[1]) * alpha
+            dirty_rects.add(atlas.blit(window, ("boss", session.boss_shoot_timer > 0), x + ox, y + oy))
+
+        # Draw lasers
+        xs, ys = session.lasers.positions(alpha)
+        for x, y in zip(xs.tolist(), ys.tolist()):
+            dirty_rects.add(atlas.blit(window, ("laser", DOUBLE_LASER_WIDTH), x + ox, y + oy))
+
+        # Draw explosions
+        explosions = session.explosions
+        n = explosions.count
+        xs, ys = explosions.positions(alpha)
+        for x, y, frame in zip(xs.tolist(), ys.tolist(), explosions.age[:n].tolist()):
+            dirty_rects.add(atlas.blit(window, ("explosion", frame), x + ox, y + oy))
+        dirty_rects.extend(session.particles.draw(window, session.camera.offset,
+                                                  doreturn=dirty_rects.enabled, alpha=alpha))
+
+        # Draw power-ups
+        power_ups = session.power_ups
+        n = power_ups.count
+        xs, ys = power_ups.positions(alpha)
+        for x, y, power_type, age in zip(xs.tolist(), ys.tolist(),
+                                         power_ups.kind[:n].tolist(), power_ups.age[:n].tolist()):
+            dirty_rects.add(self.draw_power_up(x + ox, y + oy, power_type, age))
+
+        # Collision grid debug view (F4)
+        if self.show_collision_grid:
+            session.collision_grid.draw(window)
+            dirty_rects.invalidate()
+
+        # Shield effect
+        if session.shield_active:
+            x, y = session.player_ship.position(alpha)
+            shield_radius = max(PLAYER_WIDTH, PLAYER_HEIGHT) * 0.7
+            shield_color = (128, 128, 255, 128)
+            dirty_rects.add(pygame.draw.circle(window, shield_color,
+                                               (int(x) + ox, int(y) + oy),
+                                               int(shield_radius), 2))
+
+    def draw_hud(self, session):
+        window = self.surface
+        dirty_rects = self.dirty_rects
+        text_cache = self.text_cache
+        small_font = self.small_font
+
+        # Draw UI
+        dirty_rects.add(self.draw_score(session.score, 10, 10))
+
+        high_score_text = text_cache.render(small_font, f"HIGH: {session.high_score}", YELLOW)
+        dirty_rects.add(window.blit(high_score_text, (10, 40)))
+
+        level_text = text_cache.render(small_font, f"LEVEL {session.current_level}", WHITE)
+        level_rect = level_text.get_rect(midtop=(WIDTH//2, 10))
+        dirty_rects.add(window.blit(level_text, level_rect))
+
+        lives_text = text_cache.render(small_font, f"LIVES: {session.lives}", NEON_YELLOW)
+        lives_rect = lives_text.get_rect(topright=(WIDTH-10, 10))
+        dirty_rects.add(window.blit(lives_text, lives_rect))
+
+        # Draw lives
+        for i in range(session.lives):
+            dirty_rects.add(window.blit(self.heart_img, (WIDTH - 30 - i * 25, 10)))
+
+        # Draw enemies left
+        if not session.boss:
+            enemies_left = session.levels[session.current_level].enemies
+            enemies_text = text_cache.render(small_font, f"Enemies Left: {enemies_left}", WHITE)
+            enemies_rect = enemies_text.get_rect(topright=(WIDTH-10, 50))
+            dirty_rects.add(window.blit(enemies_text, enemies_rect))
+
+        # Draw active power-ups status
+        if session.score_multiplier > 1:
+            mult_text = text_cache.render(small_font, f"{session.score_multiplier}x", POWER_UP_COLORS[0])
+            dirty_rects.add(window.blit(mult_text, (WIDTH - 50, 40)))
+
+        if session.rapid_fire:
+            rapid_text = text_cache.render(small_font, "RAPID", POWER_UP_COLORS[1])
+            dirty_rects.add(window.blit(rapid_text, (WIDTH - 60, 60)))
+
+        if session.shield_active:
+            shield_text = text_cache.render(small_font, "SHIELD", POWER_UP_COLORS[2])
+            dirty_rects.add(window.blit(shield_text, (WIDTH - 60, 80)))
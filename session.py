@@ -0,0 +1,565 @@
+import math
+import random
+
+import numpy as np
+import pygame
+
+from camera import Camera
+from entities import ComponentStore
+from levels import default_levels
+from particles import MAX_PARTICLES, ParticleSystem
+from perf_overlay import PerfOverlay
+from settings import (
+    CRASH_RECOVERY_TIME, CRASH_SHAKE_AMOUNT, CRASH_SHAKE_DURATION, DOUBLE_LASER_WIDTH,
+    ENEMY_HEIGHT, ENEMY_HIT_FLASH, ENEMY_TYPES, ENEMY_WIDTH, EXPLOSION_COLORS,
+    EXPLOSION_FRAMES, FLASH_DURATION, HEIGHT, LASER_HEIGHT, LASER_SPEED, LEVEL_START_DELAY,
+    MAX_MULTIPLIER, MULTIPLIER_DURATION, NEON_RED, PARTICLE_COUNT, PARTICLE_LIFETIME,
+    PARTICLE_SPEED, PLAYER_HEIGHT, PLAYER_SPEED, PLAYER_WIDTH, POWER_UP_SIZE, POWER_UP_SPEED,
+    RAPID_FIRE_DELAY, SCREEN_SHAKE_AMOUNT, SCREEN_SHAKE_DURATION, WIDTH, GameState,
+)
+from spatial_hash import SpatialHash
+
+# Input bits for GameSession.step(): buttons held this frame...
+LEFT = 1
+RIGHT = 2
+FIRE = 4       # SPACE
+CONTINUE = 8   # ENTER, starts a new game from the game over screen
+# ...and keys pressed this frame
+START = 16     # SPACE on the menu
+RESTART = 32   # R on the game over screen
+
+
+class PlayerShip:
+    __slots__ = ("x", "y", "prev_x", "prev_y", "flash_effect", "invulnerable", "health")
+
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+        self.prev_x = x  # Position at the start of the current step
+        self.prev_y = y
+        self.flash_effect = 0
+        self.invulnerable = 0
+        self.health = 100
+
+    def hit(self):
+        self.flash_effect = FLASH_DURATION
+        self.invulnerable = 60  # 1 second of invulnerability
+
+        # Reduce health
+        self.health -= 20
+        if self.health <= 0:
+            return True  # Player died
+        return False
+
+    def position(self, alpha=1.0):
+        # alpha of the way from the start of the step (0) to now (1)
+        return (self.prev_x + (self.x - self.prev_x) * alpha,
+                self.prev_y + (self.y - self.prev_y) * alpha)
+
+    def update(self):
+        # Update flash effect
+        if self.flash_effect > 0:
+            self.flash_effect -= 1
+
+        # Update invulnerability
+        if self.invulnerable > 0:
+            self.invulnerable -= 1
+
+
+# One game, start to finish: everything that used to be module globals in
+# game.py. step() advances it by one frame for a bitmask of input bits and
+# never touches the display or the mixer; the sounds a frame triggered are
+# left in `sounds` for whoever is playing the session to play.
+class GameSession:
+    def __init__(self, high_score=0, seed=None, perf=None, levels=None):
+        self.high_score = high_score
+        # Compiled level table (assets/levels.json unless one is passed in)
+        self.levels = levels if levels is not None else default_levels()
+        # Everything random in a session comes from its own generators, so a
+        # seed and the inputs of every frame replay a game exactly
+        if seed is None:
+            seed = random.randrange(2**32)
+        self.seed = seed
+        self.rng = random.Random(seed)
+        # Phase timings go to the game's overlay when one is passed in
+        self.perf = perf if perf is not None else PerfOverlay()
+
+        self.enemies = ComponentStore()  # kind picks the enemy image, hit_timer flashes it white
+        self.lasers = ComponentStore()
+        self.boss_lasers = ComponentStore()
+        self.power_ups = ComponentStore()  # kind is the power type, age drives the glow pulse
+        self.explosions = ComponentStore()  # age is the animation frame
+        # Every explosion and hit spark shares one particle system
+        self.particles = ParticleSystem(MAX_PARTICLES, seed=seed)
+        # World-layer camera; its offset is added to every world blit while shaking
+        self.camera = Camera(self.rng)
+        # Collision broad phase, rebuilt every frame
+        self.collision_grid = SpatialHash(cell_size=64)
+
+        self.player_ship = PlayerShip(WIDTH // 2 - PLAYER_WIDTH // 2, HEIGHT - PLAYER_HEIGHT - 20)
+        self.player_crash_speed = 0
+        self.is_crashing = False
+        self.crash_recovery_timer = 0
+        self.last_shot = 0
+        self.enemy_timer = 0
+
+        self.boss = None
+        self.boss_health = 0
+        self.boss_shoot_timer = 0
+
+        self.score = 0
+        self.current_level = 1
+        self.enemies_destroyed = 0
+        self.lives = 3  # Start with 3 lives
+        self.state = GameState.MENU
+        self.level_start_timer = 0
+
+        self.animation_frame = 0
+        self.scroll = 0  # Frames the stars have scrolled
+        self.prev_scroll = 0
+        self.prev_boss = None  # Boss position at the start of the step
+        self.frame = 0  # The session's clock: frames stepped so far
+        self.game_started = 0  # Frame the current game started on
+        self.sounds = []
+        self.reset_level()
+
+    def reset_level(self):
+        # Start the level's spawn schedule from the top
+        self.spawned = 0
+
+        # Clear all game objects
+        self.enemies.clear()
+        self.lasers.clear()
+        self.power_ups.clear()
+        self.camera.reset()
+
+        # Reset boss
+        self.boss = None
+        self.boss_health = 100
+        self.boss_lasers.clear()
+
+        # Reset power-ups
+        self.score_multiplier = 1
+        self.multiplier_timer = 0
+        self.rapid_fire = False
+        self.rapid_fire_timer = 0
+        self.shield_active = False
+        self.shield_timer = 0
+        self.double_laser = True  # Always true now
+        self.double_laser_timer = 0
+
+    def start(self):
+        self.state = GameState.PLAYING
+        self.reset_level()
+
+    def entity_counts(self):
+        return {
+            "enemies": len(self.enemies),
+            "lasers": len(self.lasers),
+            "boss lasers": len(self.boss_lasers),
+            "explosions": len(self.explosions),
+            "power-ups": len(self.power_ups),
+            "particles": len(self.particles),
+        }
+
+    def pool_stats(self):
+        # (peak in use, capacity, reallocations) of every object pool
+        stats = {name: (store.peak, store.capacity, store.grows) for name, store in (
+            ("enemies", self.enemies), ("lasers", self.lasers), ("boss lasers", self.boss_lasers),
+            ("explosions", self.explosions), ("power-ups", self.power_ups))}
+        stats["particles"] = (self.particles.peak, self.particles.max_particles, 0)
+        return stats
+
+    def spawn_explosion(self, x, y, size=1):
+        self.explosions.spawn(x, y)
+        # Sparks are 2, 3 or 4 times the explosion's size
+        self.particles.emit(x, y, 20 * size, speed=(2 * size, 8 * size), size=(2, 4), size_scale=size,
+                            colors=EXPLOSION_COLORS, lifetime=EXPLOSION_FRAMES, shrink=0.9)
+
+    def player_hit(self):
+        player_ship = self.player_ship
+        self.camera.shake(SCREEN_SHAKE_AMOUNT, SCREEN_SHAKE_DURATION)
+
+        # Create explosion particles
+        self.particles.emit(player_ship.x, player_ship.y, PARTICLE_COUNT, speed=(2, PARTICLE_SPEED),
+                            size=(2, 4), colors=[NEON_RED], lifetime=PARTICLE_LIFETIME,
+                            gravity=0.2, fade=True)
+
+        # Play hit sound
+        self.sounds.append("explosion")
+        return player_ship.hit()
+
+    def save_positions(self):
+        # Where everything is before the step moves it, so the renderer can
+        # draw any point in between
+        for store in (self.enemies, self.lasers, self.boss_lasers, self.power_ups, self.explosions):
+            store.save_positions()
+        self.particles.save_positions()
+        player_ship = self.player_ship
+        player_ship.prev_x = player_ship.x
+        player_ship.prev_y = player_ship.y
+        self.prev_boss = (self.boss[0], self.boss[1]) if self.boss else None
+        self.prev_scroll = self.scroll
+
+    def step(self, inputs):
+        self.sounds = []
+        self.save_positions()
+
+        # Keys that switch screens
+        if inputs & START and self.state == GameState.MENU:
+            self.start()
+            self.game_started = self.frame
+        elif inputs & RESTART and self.state == GameState.GAME_OVER:
+            self.start()
+            self.game_started = self.frame
+            self.score = 0
+            self.lives = 3
+            self.current_level = 1
+
+        if self.state == GameState.LEVEL_COMPLETE:
+            self.level_start_timer -= 1
+            if self.level_start_timer <= 0:
+                self.start()
+
+        elif self.state == GameState.GAME_OVER:
+            # Update high score
+            if self.score > self.high_score:
+                self.high_score = self.score
+
+            # Check for restart
+            if inputs & CONTINUE:
+                # Reset game
+                self.score = 0
+                self.lives = 3
+                self.current_level = 1
+                self.enemies.clear()
+                self.lasers.clear()
+                self.boss = None
+                self.enemies_destroyed = 0
+                self.state = GameState.PLAYING
+                self.level_start_timer = LEVEL_START_DELAY
+                self.game_started = self.frame
+
+        # Update game objects
+        if self.state == GameState.PLAYING:
+            self.update(inputs)
+            self.perf.phase("collisions")
+            self.collide()
+            self.perf.phase("update")
+
+        # Update animation frame
+        self.animation_frame += 1
+
+        # Check for boss defeat
+        boss = self.boss
+        if boss and self.boss_health <= 0:
+            # Add big explosion for boss defeat
+            for _ in range(8):
+                ex = boss[0] + self.rng.randint(0, 96)
+                ey = boss[1] + self.rng.randint(0, 96)
+                self.spawn_explosion(ex, ey, 2)
+                self.sounds.append("explosion")
+            self.boss = None
+            self.score += 1000
+            self.current_level += 1  # Keep going up in levels
+            self.state = GameState.LEVEL_COMPLETE
+            self.level_start_timer = LEVEL_START_DELAY
+
+        self.frame += 1
+
+    def update(self, inputs):
+        player_ship = self.player_ship
+        lasers = self.lasers
+        enemies = self.enemies
+        boss_lasers = self.boss_lasers
+        power_ups = self.power_ups
+        explosions = self.explosions
+
+        player_ship.update()
+        self.camera.update()
+
+        # Update crash animation
+        if self.is_crashing:
+            # Simple up and down movement
+            player_ship.y += self.player_crash_speed
+            self.player_crash_speed += 0.5  # Gravity
+
+            # Bounce off bottom of screen
+            if player_ship.y > HEIGHT - PLAYER_HEIGHT:
+                self.player_crash_speed = -self.player_crash_speed * 0.5
+                player_ship.y = HEIGHT - PLAYER_HEIGHT
+
+                # Only recover if we still have lives
+                self.crash_recovery_timer -= 1
+                if self.crash_recovery_timer <= 0:
+                    self.is_crashing = False
+                    self.player_crash_speed = 0
+
+        # Always allow shooting
+        if inputs & FIRE:
+            if self.rapid_fire:
+                if not lasers or self.frame - self.last_shot > RAPID_FIRE_DELAY:  # Faster shooting
+                    self.fire()
+                    self.last_shot = self.frame
+            else:
+                # All lasers fly at the same speed, so the lowest one is the newest
+                if not lasers or lasers.y[:lasers.count].max() < player_ship.y - 30:
+                    self.fire()
+
+        # Always allow movement
+        if inputs & LEFT and player_ship.x > 0:
+            player_ship.x -= PLAYER_SPEED
+        if inputs & RIGHT and player_ship.x < WIDTH - PLAYER_WIDTH:
+            player_ship.x += PLAYER_SPEED
+
+        # Spawn power-ups randomly
+        if self.rng.random() < 0.002:  # 0.2% chance each frame
+            power_type = self.rng.choice([0, 1, 2])  # Only spawn score multiplier, rapid fire, and shield
+            x = self.rng.randint(20, WIDTH - 20)
+            power_ups.spawn(x, -20, vy=POWER_UP_SPEED, kind=power_type)
+
+        # Update power-ups
+        power_ups.integrate()
+        n = power_ups.count
+        power_ups.alive[:n] = power_ups.y[:n] < HEIGHT
+
+        # Check collision with player (power-up boxes are centered on x, y)
+        half = POWER_UP_SIZE / 2
+        player_left = player_ship.x - PLAYER_WIDTH//2
+        player_top = player_ship.y - PLAYER_HEIGHT//2
+        collected = (power_ups.alive[:n] &
+                     (power_ups.x[:n] - half < player_left + PLAYER_WIDTH) &
+                     (power_ups.x[:n] + half > player_left) &
+                     (power_ups.y[:n] - half < player_top + PLAYER_HEIGHT) &
+                     (power_ups.y[:n] + half > player_top))
+        for i in np.flatnonzero(collected):
+            power_type = power_ups.kind[i]
+            if power_type == 0:  # Score multiplier
+                self.score_multiplier = min(MAX_MULTIPLIER, self.score_multiplier * 2)
+                self.multiplier_timer = MULTIPLIER_DURATION
+            elif power_type == 1:  # Rapid fire
+                self.rapid_fire = True
+                self.rapid_fire_timer = 300  # 5 seconds
+            elif power_type == 2:  # Shield
+                self.shield_active = True
+                self.shield_timer = 300  # 5 seconds
+            self.sounds.append("powerup")  # Play sound when collecting powerup
+            power_ups.alive[i] = False
+        power_ups.sweep()
+
+        # Update timers
+        if self.multiplier_timer > 0:
+            self.multiplier_timer -= 1
+            if self.multiplier_timer <= 0:
+                self.score_multiplier = 1
+
+        if self.rapid_fire_timer > 0:
+            self.rapid_fire_timer -= 1
+            if self.rapid_fire_timer <= 0:
+                self.rapid_fire = False
+
+        if self.shield_timer > 0:
+            self.shield_timer -= 1
+            if self.shield_timer <= 0:
+                self.shield_active = False
+
+        # Update explosions and particles
+        explosions.integrate()
+        explosions.alive[:explosions.count] = explosions.age[:explosions.count] < EXPLOSION_FRAMES
+        explosions.sweep()
+        self.particles.update()
+
+        # Update stars
+        self.scroll += 1
+
+        # Update lasers
+        lasers.integrate()
+        lasers.alive[:lasers.count] = lasers.y[:lasers.count] >= -LASER_HEIGHT
+        lasers.sweep()
+
+        # Update boss lasers (they move downward, spread shots also sideways)
+        boss_lasers.integrate()
+        boss_lasers.alive[:boss_lasers.count] = boss_lasers.y[:boss_lasers.count] <= HEIGHT
+        boss_lasers.sweep()
+
+        # Spawn and update enemies
+        level = self.levels[self.current_level]
+        boss = self.boss
+        if not boss:
+            self.enemy_timer += 1
+            enemies_remaining = level.enemies - self.enemies_destroyed
+            # The level's spawn schedule, repeated until enough enemies are destroyed
+            spawn = level.schedule[self.spawned % level.enemies]
+            if self.enemy_timer >= spawn.interval and enemies_remaining > 0:
+                self.enemy_timer = 0
+                self.spawned += 1
+                x = self.rng.randint(0, WIDTH - ENEMY_WIDTH)
+                enemy_type = self.rng.randrange(ENEMY_TYPES)  # Choose between type 1 and 2
+                enemies.spawn(x, -ENEMY_HEIGHT, vy=spawn.speed, health=spawn.health, kind=enemy_type)
+
+            enemies.integrate()
+            enemies.alive[:enemies.count] = enemies.y[:enemies.count] <= HEIGHT
+            escaped = enemies.sweep()
+            if escaped and not self.shield_active:  # Only lose life if not shielded
+                self.lives -= escaped
+                if self.lives <= 0:
+                    self.state = GameState.GAME_OVER
+        else:
+            # Boss movement
+            if boss[1] < 50:  # Boss entry
+                boss[1] += 2
+            else:  # Boss pattern
+                boss[0] = WIDTH//2 + math.sin(self.animation_frame * 0.02) * (WIDTH//3)
+
+                # Boss shooting
+                self.boss_shoot_timer += 1
+                if self.boss_shoot_timer >= level.boss_shot_delay:
+                    self.boss_shoot_timer = 0
+
+                    # Different shooting patterns for each level
+                    if level.boss_pattern == "single":
+                        # Single straight shot
+                        boss_lasers.spawn(boss[0] + 48 - 6, boss[1] + 96, vy=LASER_SPEED)
+                    elif level.boss_pattern == "double":
+                        # Double shot
+                        boss_lasers.spawn(boss[0] + 20, boss[1] + 96, vy=LASER_SPEED)
+                        boss_lasers.spawn(boss[0] + 76, boss[1] + 96, vy=LASER_SPEED)
+                    else:
+                        # Triple spread shot
+                        for i in range(3):
+                            laser_x = boss[0] + 48 - 6 + (i - 1) * 30
+                            laser_y = boss[1] + 96
+                            velocity_x = (i - 1) * 2  # Add horizontal movement
+                            boss_lasers.spawn(laser_x, laser_y, vx=velocity_x, vy=LASER_SPEED)
+
+    def fire(self):
+        # Two wide lasers with more spacing
+        laser_x1 = self.player_ship.x - 5  # Left laser
+        laser_x2 = self.player_ship.x + PLAYER_WIDTH - 21  # Right laser
+        laser_y = self.player_ship.y + 10
+        self.lasers.spawn(laser_x1, laser_y, vy=-LASER_SPEED)
+        self.lasers.spawn(laser_x2, laser_y, vy=-LASER_SPEED)
+        self.sounds.append("shoot")
+
+    def collide(self):
+        player_ship = self.player_ship
+        lasers = self.lasers
+        enemies = self.enemies
+        boss_lasers = self.boss_lasers
+        collision_grid = self.collision_grid
+
+        # Check collisions: one broad phase for everything lasers and the player can hit
+        collision_grid.clear()
+        if self.boss:
+            collision_grid.insert(("boss", 0), self.boss[0], self.boss[1], 96, 96)
+        n = enemies.count
+        for i, (x, y) in enumerate(zip(enemies.x[:n].tolist(), enemies.y[:n].tolist())):
+            collision_grid.insert(("enemy", i), x, y, ENEMY_WIDTH, ENEMY_HEIGHT)
+        n = boss_lasers.count
+        for i, (x, y) in enumerate(zip(boss_lasers.x[:n].tolist(), boss_lasers.y[:n].tolist())):
+            collision_grid.insert(("boss_laser", i), x, y, 12, 32)
+
+        n = lasers.count
+        for laser, (laser_x, laser_y) in enumerate(zip(lasers.x[:n].tolist(), lasers.y[:n].tolist())):
+            laser_rect = pygame.Rect(laser_x, laser_y, DOUBLE_LASER_WIDTH, LASER_HEIGHT)
+            # Covers both the hitbox overlap and the near-miss check below
+            candidates = collision_grid.query(laser_x - ENEMY_WIDTH//2, laser_y - ENEMY_HEIGHT//2,
+                                              ENEMY_WIDTH, ENEMY_HEIGHT)
+            hit = False
+
+            for kind, target in candidates:
+                if kind == "boss":
+                    boss = self.boss
+                    if boss is None or not laser_rect.colliderect(pygame.Rect(boss[0], boss[1], 96, 96)):
+                        continue
+                    hit = True
+                    self.boss_health -= 10
+                    self.spawn_explosion(laser_x, laser_y, 1)
+                    self.sounds.append("explosion")
+                    if self.boss_health <= 0:
+                        self.spawn_explosion(boss[0] + 48, boss[1] + 48, 3)
+                        self.sounds.append("explosion")
+                        self.boss = None
+                        self.current_level += 1  # Keep going up in levels
+                        self.state = GameState.LEVEL_COMPLETE
+                    break
+                elif kind == "enemy":
+                    enemy_x = float(enemies.x[target])
+                    enemy_y = float(enemies.y[target])
+                    if not enemies.alive[target] or not laser_rect.colliderect(
+                            pygame.Rect(enemy_x, enemy_y, ENEMY_WIDTH, ENEMY_HEIGHT)):
+                        continue
+                    hit = True
+                    enemies.health[target] -= 1
+                    enemies.hit_timer[target] = ENEMY_HIT_FLASH
+                    if enemies.health[target] <= 0:  # Only remove enemy if health reaches 0
+                        enemies.alive[target] = False
+                        self.score += 10 * self.score_multiplier
+                        self.spawn_explosion(enemy_x + ENEMY_WIDTH//2,
+                                             enemy_y + ENEMY_HEIGHT//2)
+                        self.sounds.append("explosion")
+                    break
+
+            if not hit:
+                # Near miss: laser within half an enemy of the enemy's corner
+                for kind, target in candidates:
+                    if (kind == "enemy" and enemies.alive[target] and
+                            abs(laser_x - enemies.x[target]) < ENEMY_WIDTH//2 and
+                            abs(laser_y - enemies.y[target]) < ENEMY_HEIGHT//2):
+                        hit = True
+                        enemies.health[target] -= 1
+                        if enemies.health[target] <= 0:
+                            enemies.alive[target] = False
+                            self.enemies_destroyed += 1
+                            self.score += 100
+                            # Create explosion effect
+                            self.spawn_explosion(float(enemies.x[target]), float(enemies.y[target]))
+                        break
+
+            if hit:
+                lasers.alive[laser] = False
+
+        # Player against enemies and boss lasers
+        player_rect = pygame.Rect(player_ship.x - PLAYER_WIDTH//2, player_ship.y - PLAYER_HEIGHT//2,
+                                  PLAYER_WIDTH, PLAYER_HEIGHT)
+        reach_x = (ENEMY_WIDTH + PLAYER_WIDTH)//2
+        reach_y = (ENEMY_HEIGHT + PLAYER_HEIGHT)//2
+        for kind, target in collision_grid.query(player_ship.x - reach_x, player_ship.y - reach_y,
+                                                 2 * reach_x, 2 * reach_y):
+            if kind == "enemy":
+                # Only check collision if not invulnerable
+                if (enemies.alive[target] and not player_ship.invulnerable and
+                        abs(player_ship.x - enemies.x[target]) < reach_x and
+                        abs(player_ship.y - enemies.y[target]) < reach_y):
+                    enemies.alive[target] = False
+                    if self.player_hit():  # Player died
+                        self.state = GameState.GAME_OVER
+            elif kind == "boss_laser":
+                boss_laser_rect = pygame.Rect(float(boss_lasers.x[target]), float(boss_lasers.y[target]), 12, 32)
+                if not boss_laser_rect.colliderect(player_rect) or self.is_crashing:
+                    continue
+                boss_lasers.alive[target] = False
+                if not self.shield_active:
+                    self.lives -= 1  # Reduce lives by 1
+                    # Crash effect
+                    self.is_crashing = True
+                    self.crash_recovery_timer = CRASH_RECOVERY_TIME
+                    self.player_crash_speed = -10
+                    self.camera.shake(CRASH_SHAKE_AMOUNT, CRASH_SHAKE_DURATION)
+                    self.sounds.append("explosion")
+                    if self.lives <= 0:
+                        # Multiple explosions for game over
+                        for _ in range(8):
+                            ex = self.rng.randint(0, WIDTH)
+                            ey = self.rng.randint(0, HEIGHT)
+                            self.spawn_explosion(ex, ey, 3)
+                            self.sounds.append("explosion")
+                        self.state = GameState.GAME_OVER
+                else:
+                    # Shield hit effect
+                    self.shield_timer = max(60, self.shield_timer)  # At least 1 more second
+
+        # Swap-remove everything that was used up in one go
+        lasers.sweep()
+        boss_lasers.sweep()
+        enemies.sweep()
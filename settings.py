@@ -0,0 +1,76 @@
+# Constants shared by the simulation (session.py) and the renderer (renderer.py)
+
+# Window
+WIDTH = 800
+HEIGHT = 600
+
+# Timing: the simulation advances in fixed steps of 1/FPS seconds whatever the
+# display rate. After a hitch at most MAX_CATCH_UP_STEPS are run to catch up;
+# time beyond that is dropped, so the game slows down for a moment instead of
+# falling further and further behind.
+FPS = 60
+STEP = 1 / FPS
+MAX_CATCH_UP_STEPS = 5
+
+# Colors (classic arcade neon colors)
+WHITE = (255, 255, 255)
+NEON_RED = (255, 50, 50)
+NEON_BLUE = (50, 50, 255)
+NEON_GREEN = (50, 255, 50)
+NEON_PINK = (255, 50, 255)
+NEON_YELLOW = (255, 255, 50)
+RED = (255, 0, 0)
+YELLOW = (255, 255, 0)
+
+# Player dimensions
+PLAYER_WIDTH = 40
+PLAYER_HEIGHT = 40
+
+# Power-ups (type 0: Score Multiplier, 1: Rapid Fire, 2: Shield, 3: Double Laser)
+POWER_UP_COLORS = [(255, 223, 0), (0, 255, 255), (255, 0, 255), (0, 255, 0)]  # Gold, Cyan, Magenta, Green
+POWER_UP_SIZE = 20
+POWER_UP_SPEED = 2
+MAX_MULTIPLIER = 8
+MULTIPLIER_DURATION = 300  # 5 seconds at 60 FPS
+
+# Player
+PLAYER_SPEED = 6
+RAPID_FIRE_DELAY = 6  # Frames between rapid-fire shots (100 ms at 60 FPS)
+CRASH_RECOVERY_TIME = 120  # 2 seconds at 60 FPS
+
+# Laser
+LASER_WIDTH = 8
+LASER_HEIGHT = 24
+DOUBLE_LASER_WIDTH = 16  # Wider laser for double shot
+LASER_SPEED = 10
+
+# Enemy
+ENEMY_WIDTH = 48
+ENEMY_HEIGHT = 48
+ENEMY_TYPES = 2  # Red and green enemies
+ENEMY_HIT_FLASH = 5  # Flash for 5 frames
+
+# Game state
+class GameState:
+    MENU = 0
+    PLAYING = 1
+    LEVEL_COMPLETE = 2
+    GAME_OVER = 3
+
+LEVEL_START_DELAY = 180  # 3 seconds at 60 FPS
+
+# Explosion animation: a burst of particles plus expanding vector rays
+EXPLOSION_FRAMES = 12
+EXPLOSION_COLORS = [NEON_RED, NEON_YELLOW, WHITE]
+
+# Hit effect parameters
+SCREEN_SHAKE_AMOUNT = 20
+SCREEN_SHAKE_DURATION = 30
+FLASH_DURATION = 10
+PARTICLE_COUNT = 30
+PARTICLE_SPEED = 8
+PARTICLE_LIFETIME = 40
+
+# Screen shake when a boss laser knocks the player out of control
+CRASH_SHAKE_AMOUNT = 20
+CRASH_SHAKE_DURATION = 60  # 1 second at 60 FPS
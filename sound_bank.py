@@ -0,0 +1,97 @@
+import hashlib
+import marshal
+import os
+
+import numpy as np
+import pygame
+
+from generate_ai_sounds import synth_explosion, synth_laser, synth_powerup
+
+# Every sound effect the game can play: name -> (synth function, its
+# parameters). The synths in the generate_* scripts are the only definition
+# of each sound; the bank renders them at the mixer's rate straight into
+# memory instead of decoding the WAV files the scripts write. The music is
+# streamed instead, see music.py.
+SOUNDS = {
+    "shoot": (synth_laser, {}),
+    "explosion": (synth_explosion, {"seed": 0}),  # Fixed noise, so it can be cached
+    "powerup": (synth_powerup, {}),
+}
+
+# pygame.mixer.get_init() sample size -> sample type (-32 is float)
+SAMPLE_TYPES = {
+    8: np.uint8,
+    -8: np.int8,
+    16: np.uint16,
+    -16: np.int16,
+    32: np.float32,
+    -32: np.float32,
+}
+
+
+def to_mixer_format(samples, size, channels):
+    # Mono 16-bit samples -> the raw bytes pygame.mixer.Sound(buffer=...)
+    # expects for the mixer's sample size and channel count
+    sample_type = SAMPLE_TYPES.get(size)
+    if sample_type is None:
+        raise ValueError(f"unsupported mixer sample size {size}")
+    samples = samples.astype(np.int32)
+    if sample_type is np.float32:
+        samples = samples / 32768.0
+    elif abs(size) == 8:
+        samples = samples >> 8
+    if size > 0 and sample_type is not np.float32:
+        samples = samples + (1 << (size - 1))  # Unsigned: silence is mid-scale
+    samples = samples.astype(sample_type)
+    # Interleave the same signal into every channel
+    return np.repeat(samples[:, np.newaxis], channels, axis=1).tobytes()
+
+
+def cache_key(name, mixer_format):
+    # Changes whenever the synth's code, its parameters or the mixer format do
+    synth, params = SOUNDS[name]
+    key = hashlib.sha1()
+    key.update(marshal.dumps(synth.__code__))
+    key.update(repr((name, sorted(params.items()), mixer_format)).encode())
+    return key.hexdigest()[:16]
+
+
+# Mixer sounds rendered on first use. With a cache directory each rendered
+# buffer is also kept on disk, already in the mixer's format, so later runs
+# load it back without synthesizing anything.
+class SoundBank:
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir
+        self.sounds = {}
+
+    def __getitem__(self, name):
+        sound = self.sounds.get(name)
+        if sound is None:
+            sound = self.sounds[name] = pygame.mixer.Sound(buffer=self.render(name))
+        return sound
+
+    def render(self, name):
+        mixer_format = pygame.mixer.get_init()
+        if mixer_format is None:
+            raise pygame.error("the mixer must be initialized before sounds are made")
+        frequency, size, channels = mixer_format
+
+        path = None
+        if self.cache_dir:
+            path = os.path.join(self.cache_dir, f"{name}-{cache_key(name, mixer_format)}.raw")
+            try:
+                with open(path, 'rb') as f:
+                    return f.read()
+            except OSError:
+                pass
+
+        synth, params = SOUNDS[name]
+        data = to_mixer_format(synth(sample_rate=frequency, **params), size, channels)
+
+        if path:
+            # Write then rename, so a half-written file is never read back
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(path + '.tmp', 'wb') as f:
+                f.write(data)
+            os.replace(path + '.tmp', path)
+        return data
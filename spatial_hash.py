@@ -0,0 +1,74 @@
+import pygame
+
+GRID_COLOR = (0, 120, 255)
+
+
+# Uniform grid broad phase for collision checks. The grid is cleared and
+# refilled every frame; queries only look at the cells a box touches, so the
+# cost follows how crowded that part of the screen is instead of the product
+# of the entity lists. A cell's list is kept once made and only emptied by
+# clear(), so refilling the grid every frame reuses the same lists.
+class SpatialHash:
+    def __init__(self, cell_size=64):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.occupied = []  # Lists filled since the last clear()
+        self.count = 0
+
+    def clear(self):
+        for bucket in self.occupied:
+            bucket.clear()
+        self.occupied.clear()
+        self.count = 0
+
+    def _cells(self, x, y, w, h):
+        size = self.cell_size
+        for cx in range(int(x // size), int((x + w) // size) + 1):
+            for cy in range(int(y // size), int((y + h) // size) + 1):
+                yield cx, cy
+
+    def insert(self, item, x, y, w, h):
+        # Items remember their insertion order so queries can return them
+        # in the same order as the lists they came from
+        entry = (self.count, item)
+        self.count += 1
+        for cell in self._cells(x, y, w, h):
+            bucket = self.cells.get(cell)
+            if bucket is None:
+                bucket = self.cells[cell] = []
+            if not bucket:
+                self.occupied.append(bucket)
+            bucket.append(entry)
+
+    def query(self, x, y, w, h):
+        # Every item sharing a cell with the box, once each, in insertion order
+        found = {}
+        for cell in self._cells(x, y, w, h):
+            bucket = self.cells.get(cell)
+            if bucket:
+                for order, item in bucket:
+                    found[order] = item
+        return [found[order] for order in sorted(found)]
+
+    def snapshot(self, into=None):
+        # Copy of the occupied cells, for drawing on another thread; passing
+        # the copy made last time refills its lists
+        if into is None:
+            into = SpatialHash(self.cell_size)
+        into.clear()
+        for cell, bucket in self.cells.items():
+            if bucket:
+                copied = into.cells.get(cell)
+                if copied is None:
+                    copied = into.cells[cell] = []
+                copied.extend(bucket)
+                into.occupied.append(copied)
+        into.count = self.count
+        return into
+
+    def draw(self, surface, color=GRID_COLOR):
+        # Debug view: outline every occupied cell
+        size = self.cell_size
+        for (cx, cy), bucket in self.cells.items():
+            if bucket:
+                pygame.draw.rect(surface, color, (cx * size, cy * size, size, size), 1)
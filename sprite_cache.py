@@ -0,0 +1,54 @@
+from collections import OrderedDict
+
+import pygame
+
+
+# Least-recently-used cache of pre-rendered surfaces. `render` is called
+# with the key's parts the first time a key is asked for; after that the
+# same surface is handed back, so drawing it is just a blit.
+class SpriteCache:
+    def __init__(self, render, max_entries=512):
+        self.render = render
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._sprites = OrderedDict()
+
+    def __len__(self):
+        return len(self._sprites)
+
+    def get(self, *key):
+        sprite = self._sprites.get(key)
+        if sprite is not None:
+            self._sprites.move_to_end(key)
+            self.hits += 1
+            return sprite
+        self.misses += 1
+        sprite = self.render(*key)
+        self._sprites[key] = sprite
+        if len(self._sprites) > self.max_entries:
+            self._sprites.popitem(last=False)
+        return sprite
+
+    def clear(self):
+        self._sprites.clear()
+
+
+# Fixed set of pre-rendered variants of the vector shapes. Each entry is
+# drawn once by calling the original drawing function on a transparent
+# surface at `origin`; blitting it at (x, y) puts that origin at (x, y).
+class SpriteAtlas:
+    def __init__(self):
+        self.sprites = {}
+
+    def __len__(self):
+        return len(self.sprites)
+
+    def add(self, key, size, origin, draw, *args):
+        surface = pygame.Surface(size, pygame.SRCALPHA)
+        draw(surface, origin[0], origin[1], *args)
+        self.sprites[key] = (surface.convert_alpha(), origin)
+
+    def blit(self, target, key, x, y):
+        sprite, (origin_x, origin_y) = self.sprites[key]
+        return target.blit(sprite, (x - origin_x, y - origin_y))
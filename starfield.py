@@ -0,0 +1,67 @@
+import random
+
+import pygame
+
+STAR_COLOR = (255, 255, 255)
+TRANSPARENT = (0, 0, 0)
+
+
+# Scrolling background stars. Every star speed gets its own screen-sized
+# layer with its stars drawn on once; scrolling a layer is two blits (the
+# layer and its wrapped-around copy), however many stars it holds.
+class Starfield:
+    def __init__(self, width, height, count=150, speeds=(1, 3), sizes=(1, 3), rng=random):
+        self.width = width
+        self.height = height
+        self.layers = {}
+        self.offsets = {}
+        self.previous_offsets = {}  # Where each layer was drawn the time before
+        self.stars = []
+        for speed in range(speeds[0], speeds[1] + 1):
+            layer = pygame.Surface((width, height)).convert()
+            layer.fill(TRANSPARENT)
+            self.layers[speed] = layer
+            self.offsets[speed] = 0
+            self.previous_offsets[speed] = 0
+
+        for _ in range(count):
+            x = rng.randint(0, width)
+            y = rng.randint(0, height)
+            speed = rng.randint(*speeds)  # Different star speeds
+            size = rng.randint(*sizes)    # Different star sizes
+            self.stars.append((x, y, speed, size))
+            # Draw stars near the top and bottom edges twice so the layer tiles
+            for wrap_y in (y - height, y, y + height):
+                pygame.draw.circle(self.layers[speed], STAR_COLOR, (x, wrap_y), size)
+
+        # Run-length encoded colorkey blits skip the empty space between stars
+        for layer in self.layers.values():
+            layer.set_colorkey(TRANSPARENT, pygame.RLEACCEL)
+
+    def scroll_to(self, frames):
+        # Position every layer as if it had scrolled for that many frames
+        # (fractions of a frame included)
+        for speed in self.offsets:
+            self.previous_offsets[speed] = self.offsets[speed]
+            self.offsets[speed] = speed * frames % self.height
+
+    def dirty_rects(self):
+        # Screen areas each star covered before and after the last scroll
+        # (including the copy drawn past the edge when it wraps around)
+        height = self.height
+        rects = []
+        for x, y, speed, size in self.stars:
+            for star_y in ((y + self.offsets[speed]) % height, (y + self.previous_offsets[speed]) % height):
+                rect = pygame.Rect(x - size, star_y - size, size * 2 + 1, size * 2 + 1)
+                rects.append(rect)
+                if rect.top < 0:
+                    rects.append(rect.move(0, height))
+                elif rect.bottom > height:
+                    rects.append(rect.move(0, -height))
+        return rects
+
+    def draw(self, surface):
+        for speed, layer in self.layers.items():
+            offset = self.offsets[speed]
+            surface.blit(layer, (0, offset))
+            surface.blit(layer, (0, offset - self.height))
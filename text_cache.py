@@ -0,0 +1,56 @@
+import pygame
+
+from sprite_cache import SpriteCache
+
+TEXT_CACHE_SIZE = 256
+
+
+# Rendered text surfaces keyed by (font, text, color). Labels that do not
+# change from frame to frame are rasterized once and then only blitted; the
+# least recently used strings are evicted once the cache is full.
+class TextCache:
+    def __init__(self, max_entries=TEXT_CACHE_SIZE):
+        self.surfaces = SpriteCache(self._render, max_entries)
+
+    def _render(self, font, text, color):
+        return font.render(text, True, color)
+
+    def render(self, font, text, color):
+        return self.surfaces.get(font, text, color)
+
+
+# All glyphs of a character set rendered once into a single strip. Text made
+# of those characters (the score digits) is drawn by blitting the matching
+# strip areas side by side instead of rasterizing the string every frame.
+class GlyphAtlas:
+    # Long enough a run to measure the font's fractional advance per glyph
+    ADVANCE_SAMPLE = 16
+
+    def __init__(self, font, color, characters="0123456789"):
+        glyphs = [font.render(char, True, color) for char in characters]
+        self.height = max(glyph.get_height() for glyph in glyphs)
+        self.surface = pygame.Surface((sum(glyph.get_width() for glyph in glyphs), self.height),
+                                      pygame.SRCALPHA)
+        self.areas = {}
+        self.advances = {}
+        x = 0
+        for char, glyph in zip(characters, glyphs):
+            # RGBA_MAX onto the empty strip copies the glyph pixels unblended
+            self.surface.blit(glyph, (x, 0), special_flags=pygame.BLEND_RGBA_MAX)
+            self.areas[char] = pygame.Rect(x, 0, glyph.get_width(), glyph.get_height())
+            self.advances[char] = font.size(char * self.ADVANCE_SAMPLE)[0] / self.ADVANCE_SAMPLE
+            x += glyph.get_width()
+        self.surface = self.surface.convert_alpha()
+
+    def draw(self, surface, text, pos):
+        x, y = pos
+        right = x
+        batch = []
+        for char in text:
+            area = self.areas[char]
+            left = round(x)
+            batch.append((self.surface, (left, y), area))
+            right = max(right, left + area.width)
+            x += self.advances[char]
+        surface.blits(batch, doreturn=False)
+        return pygame.Rect(pos[0], y, right - pos[0], self.height)
@@ -0,0 +1,89 @@
+import pygame
+
+# Mixer channels set aside for each use, in channel order. All of them are
+# reserved, so a plain Sound.play() elsewhere can never take one.
+CHANNEL_GROUPS = (
+    ("effects", 4),
+    ("music", 1),       # Streamed by music.MusicSequencer
+)
+
+# Effect voices: name -> (priority, most copies playing at once). When every
+# effects channel is busy a sound may cut off one with a lower priority, so
+# weapon fire can't drown out an explosion or a power-up pickup.
+SOUND_VOICES = {
+    "powerup": (3, 1),
+    "explosion": (2, 3),
+    "shoot": (1, 2),
+}
+
+
+# Plays a frame's worth of sound triggers on a fixed set of channels: every
+# sound is played at most once per frame, at most `limit` copies of it ring at
+# once (a new one restarts the oldest) and a full set of channels gives way to
+# the more important sound.
+class VoiceManager:
+    def __init__(self, sounds):
+        self.sounds = sounds        # name -> pygame.mixer.Sound (a SoundBank)
+        self.groups = {}
+        self.channels = []
+        self.voices = []            # (name, priority, started) per effects channel, or None
+        self.frame = 0
+
+        # Counters for tuning the limits
+        self.played = 0
+        self.coalesced = 0
+        self.stolen = 0
+        self.dropped = 0
+
+    def open(self):
+        # Call once the mixer is initialized
+        first = 0
+        for name, count in CHANNEL_GROUPS:
+            self.groups[name] = [pygame.mixer.Channel(i) for i in range(first, first + count)]
+            first += count
+        if pygame.mixer.get_num_channels() < first:
+            pygame.mixer.set_num_channels(first)
+        pygame.mixer.set_reserved(first)
+
+        self.channels = self.groups["effects"]
+        self.voices = [None] * len(self.channels)
+
+    def play(self, names):
+        # One frame's triggers (session.sounds): repeats collapse into one
+        # and the most important sounds get their channels first
+        self.frame += 1
+        triggered = set(names)
+        self.coalesced += len(names) - len(triggered)
+        for name in sorted(triggered, key=lambda name: (-SOUND_VOICES[name][0], name)):
+            self.start(name)
+
+    def start(self, name):
+        priority, limit = SOUND_VOICES[name]
+
+        free = []
+        copies = []
+        for index, channel in enumerate(self.channels):
+            voice = self.voices[index]
+            if voice is not None and not channel.get_busy():
+                voice = self.voices[index] = None
+            if voice is None:
+                free.append(index)
+            elif voice[0] == name:
+                copies.append(index)
+
+        if len(copies) >= limit:
+            # Restart the oldest copy instead of stacking another one
+            index = min(copies, key=lambda index: self.voices[index][2])
+        elif free:
+            index = free[0]
+        else:
+            # Cut off the least important, oldest sound if it matters less
+            index = min(range(len(self.voices)), key=lambda index: self.voices[index][1:])
+            if self.voices[index][1] >= priority:
+                self.dropped += 1
+                return
+            self.stolen += 1
+
+        self.channels[index].play(self.sounds[name])
+        self.voices[index] = (name, priority, self.frame)
+        self.played += 1